@@ -73,8 +73,11 @@ _CONST=_np.array([4.715922776012983e+257+2.3562408023262842e+251j,
 from .options import gopts
 from .eig import Eig
 from .op import OP
-from .ep import EP
+from .ep import EP, EPScan
 from .loci import Loci
+from .continuation import Sweep, EPTracker
+from .reconstruction import Surrogate
+from .rom import ReducedModel
 from . import lda_func
 
 
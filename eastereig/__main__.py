@@ -37,13 +37,22 @@ from eastereig import loci
 from eastereig import ep
 from eastereig import lda_func
 from eastereig import eigSolvers
+from eastereig import cache
+from eastereig import storage
+from eastereig import factor
+from eastereig import stats
+from eastereig import nu_func
+from eastereig import series
+from eastereig import continuation
+from eastereig import reconstruction
+from eastereig import rom
 
 if _petscHere:
     from eastereig.examples import WGimpedance_petsc
 
 # invoke the testmod function to run tests contained in docstring
-mod_list = [lda_func, utils, loci, ep, eigSolvers, WGimpedance_numpy,
-            WGimpedance_scipysp, ThreeDoF]
+mod_list = [series, lda_func, nu_func, utils, cache, storage, factor, stats, loci, ep, eigSolvers, continuation,
+            reconstruction, rom, WGimpedance_numpy, WGimpedance_scipysp, ThreeDoF]
 if _petscHere:
     petsc_list = [WGimpedance_petsc]
     mod_list.extend(petsc_list)
@@ -125,26 +125,33 @@ def adaptMat(obj, lib):
     
     remarks :
     ---------
-    copy, dot, duplicate return the native object type
+    copy, dot, tdot, duplicate return the native object type
     set return an adatper object
     """    
           
           
     if lib=='petsc':
+        def tdot(v):
+            y = obj.createVecRight()
+            obj.multTranspose(v, y)
+            return y
         ADAPTER={'duplicate':obj.duplicate, # duplicate copy patern but not the values, use before set !
                   'dot':obj.__mul__,
+                  'tdot':tdot,            # product with the transposed matrix (not conjugate)
                   'copy':obj.copy,
                   } 
                   
     elif lib=='numpy':                   
         ADAPTER={'duplicate':obj.copy,
                  'dot':obj.dot,
+                 'tdot':lambda v: obj.T.dot(v),
                  'copy':obj.copy
                  }
                  
     elif lib=='scipysp':
         ADAPTER={'duplicate':obj.copy,
                  'dot':obj.__mul__,
+                 'tdot':lambda v: obj.T @ v,
                  'copy':obj.copy
                  } # #FIXME with scipy we use full numpy vector, fill don't belong to scipy !
     else:
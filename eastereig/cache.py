@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define a memory-budgeted cache for the operator derivative matrices
+
+The derivatives of the operator matrices `dK[i](n)` are used for all the
+derivative orders and for all the eigenpairs computed with the same `OP`.
+The user functions may build a new matrix at each call, so the evaluated
+matrices are kept in a least recently used (LRU) cache with a maximal size
+in bytes.
+
+Examples
+--------
+>>> import numpy as np
+>>> cache = MatrixCache(max_bytes=2*8*10)
+>>> cache.get((0, 1), lambda: np.ones(10))
+array([1., 1., 1., 1., 1., 1., 1., 1., 1., 1.])
+>>> _ = cache.get((0, 1), lambda: np.ones(10))
+>>> _ = cache.get((0, 2), lambda: np.zeros(10))
+>>> _ = cache.get((1, 1), lambda: np.zeros(10))
+>>> cache
+Instance of MatrixCache with #2 matrices (160/160 bytes), hits=1, misses=3, evictions=1
+>>> (0, 1) in cache, (0, 2) in cache
+(False, True)
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import threading
+
+
+def nbytes(M):
+    """ Estimate the memory used by a matrix, whatever the linear algebra lib.
+
+    Parameters
+    ----------
+    M : matrix
+        numpy array, scipy sparse matrix, petsc Mat or 0
+
+    Returns
+    -------
+    size : int
+        the estimated size in bytes
+
+    Examples
+    --------
+    >>> import scipy.sparse as sps
+    >>> nbytes(sps.eye(10, format='csr')) == 10*8 + 10*4 + 11*4
+    True
+    >>> nbytes(0)
+    0
+    """
+    # numpy array
+    if hasattr(M, 'nbytes'):
+        return int(M.nbytes)
+    # scipy sparse matrix
+    size = 0
+    for attr in ('data', 'indices', 'indptr', 'row', 'col', 'offsets'):
+        a = getattr(M, attr, None)
+        if hasattr(a, 'nbytes'):
+            size += a.nbytes
+    if size:
+        return int(size)
+    # petsc matrix (local memory)
+    try:
+        return int(M.getInfo()['memory'])
+    except Exception:
+        return 0
+
+
+class MatrixCache:
+    """ Least recently used cache of evaluated matrices with a byte budget.
+
+    The cache is thread-safe and can be shared between several eigenpairs. The
+    matrices are evaluated outside the lock, thus different matrices can be
+    evaluated concurrently, and a matrix requested by several threads is
+    evaluated only once. A matrix whose evaluation started before `clear` is
+    returned to its caller but is not stored.
+
+    Attributes
+    ----------
+    max_bytes: int
+        the maximal size of the stored matrices
+    size: int
+        the current size of the stored matrices
+    hits: int
+        the number of requests found in the cache
+    misses: int
+        the number of requests that needed an evaluation
+    evictions: int
+        the number of matrices removed to respect the budget
+    """
+
+    def __init__(self, max_bytes):
+        """ Init the cache with its budget in bytes
+        """
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        # the matrices being evaluated, see `get`
+        self._pending = {}
+        # incremented by `clear`, the evaluations started before are not stored
+        self._generation = 0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return ("Instance of {} with #{} matrices ({}/{} bytes), hits={},"
+                " misses={}, evictions={}").format(self.__class__.__name__,
+                                                   len(self._data), self.size,
+                                                   self.max_bytes, self.hits,
+                                                   self.misses, self.evictions)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, compute, size=None):
+        """ Get the matrix associated to `key`, evaluate it if needed.
+
+        Parameters
+        ----------
+        key : hashable
+            the key of the matrix, for instance (Kid, n)
+        compute : callable
+            function without argument called to evaluate the matrix
+        size : int or callable, optional
+            the size of the matrix in bytes, estimated with `nbytes` if None.
+            If callable, it is called with the evaluated matrix and may return
+            None. Use 0 for matrices that are not copies (e.g. references to `K`).
+
+        Returns
+        -------
+        M : matrix
+            the cached or the evaluated matrix
+        """
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key][0]
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                self.misses += 1
+                pending = self._pending[key] = Future()
+                generation = self._generation
+            else:
+                self.hits += 1
+        if not owner:
+            # evaluated by another thread
+            return pending.result()
+        # the evaluation is done outside the lock, other keys are not blocked
+        try:
+            M = compute()
+            if callable(size):
+                size = size(M)
+            if size is None:
+                size = nbytes(M)
+        except BaseException as e:
+            with self._lock:
+                self._release(key, pending)
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            # too large or outdated matrices are not cached
+            if size <= self.max_bytes and generation == self._generation:
+                self._data[key] = (M, size)
+                self.size += size
+                self._evict()
+            self._release(key, pending)
+        pending.set_result(M)
+        return M
+
+    def _release(self, key, pending):
+        """ Remove the pending evaluation of `key`, if it has not been removed by `clear`.
+        """
+        if self._pending.get(key) is pending:
+            del self._pending[key]
+
+    def _evict(self):
+        """ Remove the least recently used matrices until the budget is respected.
+        """
+        while self.size > self.max_bytes and self._data:
+            _, (_, size) = self._data.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def resize(self, max_bytes):
+        """ Change the budget of the cache and evict matrices if needed.
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """ Remove all the matrices, the counters are kept.
+
+        The pending evaluations are forgotten, their results will not be stored.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> cache = MatrixCache(max_bytes=1000)
+        >>> def compute():
+        ...     cache.clear()    # e.g. `setnu0` called during the evaluation
+        ...     return np.ones(2)
+        >>> cache.get((0, 1), compute)
+        array([1., 1.])
+        >>> (0, 1) in cache, len(cache)
+        (False, 0)
+        """
+        with self._lock:
+            self._data.clear()
+            self._pending.clear()
+            self._generation += 1
+            self.size = 0
@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define the continuation of eigenvalues along a parameter sweep
+
+The `Sweep` class follows a set of modes along a list of `nu` values. At each
+point, the Taylor (or Padé) series of the eigenvalues, obtained at the last
+expansion point, predict the eigenvalues:
+
+  - the shift-invert target is the mean of the predicted eigenvalues and the
+  ARPACK starting vector is the sum of the previous eigenvectors,
+  - the computed eigenvalues are matched to the predicted ones,
+  - the derivatives are computed only when the relative error of the predictor
+  is above `rtol`, then this point becomes the new expansion point.
+
+The `EPTracker` class follows an EP when a second parameter varies, with
+`EP.locate` and the Newton refinement `EP.refine` at each step.
+
+Examples
+--------
+Follow the two least attenuated modes of the impedance waveguide
+>>> import numpy as np
+>>> from eastereig import gopts
+>>> from eastereig.examples.WGimpedance_scipysp import Zscipysp
+>>> k0 = 2*np.pi*200/340.
+>>> factory = lambda z: Zscipysp(z=z, n=20, h=1., rho=1.2, c=340., k=k0)
+>>> nus = 486.198103097114 + 397.605679264872j + np.linspace(0, 20, 11)
+>>> gopts['silent'] = True
+>>> sweep = Sweep(factory, modes=[0, 1], nev=4, N=6, rtol=1e-6).run(nus)
+>>> ref = factory(nus[-1])
+>>> ref.createSolver(pb_type='gen')
+>>> lda_ref = ref.solver.solve(nev=4, target=0+0j)
+>>> gopts['silent'] = False
+>>> np.allclose(sweep.lda[-1], lda_ref[:2], rtol=1e-10)
+True
+>>> len(sweep.expansion) < len(nus)
+True
+
+The factorizations of the bordered matrices are not kept along the sweep
+>>> all(vp._factor is None for evs in sweep.eigs.values() for vp in evs)
+True
+"""
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from .stats import Stats
+
+
+class Sweep:
+    """ Continuation of a set of modes along a parameter sweep, with a Taylor or
+    Padé predictor.
+
+    Parameters
+    ----------
+    opFactory : callable
+        opFactory(nu) returns the OP instance at nu0=nu
+    modes : list
+        the index of the followed modes at the first point, sorted as by the solver
+    pb_type : string
+        the type of eigenvalue problem, see `OP.createSolver`
+    nev : int
+        the number of requested eigenpairs at each point, at least len(modes)
+    target : complex
+        the target of the solver at the first point
+    N : int
+        the number of derivatives computed at the expansion points
+    predictor : {'taylor', 'pade'}
+        the series used to predict the eigenvalues
+    rtol : float
+        the relative error of the predictor above which the derivatives are
+        computed at the current point
+    skipsym : bool
+        remove eigenvalue with imag lda< 0
+    workers : int
+        the number of threads to compute the derivatives, see `OP.getDerivatives`
+
+    Attributes
+    ----------
+    nus : array
+        the sweep points
+    lda : array
+        `lda[p, k]` is the eigenvalue of the k-th mode at `nus[p]`
+    pred_err : array
+        `pred_err[p, k]` is the relative error of the predictor, 0 at the first point
+    expansion : list
+        the index of the points where the derivatives have been computed
+    eigs : dict
+        `eigs[p]` contains the Eig objects, with their derivatives, of the
+        expansion point p. Their factorizations are released
+    stats : Stats
+        the profiling of the computations, see the `stats` module
+    """
+
+    def __init__(self, opFactory, modes, pb_type='gen', nev=6, target=0+0j, N=8,
+                 predictor='taylor', rtol=1e-6, skipsym=False, workers=1):
+        """ Init the sweep parameters.
+        """
+        if predictor not in ('taylor', 'pade'):
+            raise ValueError("The predictor should be 'taylor' or 'pade'")
+        self.opFactory = opFactory
+        self.modes = list(modes)
+        self.pb_type = pb_type
+        self.nev = max(nev, len(self.modes))
+        self.target = target
+        self.N = N
+        self.predictor = predictor
+        self.rtol = rtol
+        self.skipsym = skipsym
+        self.workers = workers
+        self.stats = Stats(self.__class__.__name__)
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        try:
+            npts, nexp = len(self.nus), len(self.expansion)
+        except AttributeError:
+            npts, nexp = 0, 0
+        return "Instance of {} following #{} modes on #{} points, with #{} expansion points".format(
+            self.__class__.__name__, len(self.modes), npts, nexp)
+
+    def _predict(self, vp, nu):
+        """ Predict the eigenvalue at nu from the series of vp.
+        """
+        if self.predictor == 'pade':
+            return complex(vp.pade(nu))
+        return complex(vp.taylor(nu))
+
+    def run(self, nus):
+        """ Follow the modes along nus.
+
+        Parameters
+        ----------
+        nus : iterable
+            the sweep points, the steps must be small enough for the predictor
+
+        Returns
+        -------
+        self : Sweep
+            the sweep, with the results in the attributes
+        """
+        self.nus = np.asarray(nus)
+        M = len(self.modes)
+        self.lda = np.zeros((len(self.nus), M), dtype=complex)
+        self.pred_err = np.zeros((len(self.nus), M))
+        self.expansion = []
+        self.eigs = {}
+        current, v0 = None, None
+        for p, nu in enumerate(self.nus):
+            op = self.opFactory(nu)
+            op.createSolver(pb_type=self.pb_type)
+            with self.stats.timer('solve', p):
+                if current is None:
+                    op.solver.solve(nev=self.nev, target=self.target, skipsym=self.skipsym)
+                    ind = self.modes
+                else:
+                    pred = np.array([self._predict(vp, nu) for vp in current])
+                    kwargs = {} if op._lib == 'petsc' else {'v0': v0}
+                    Lda = op.solver.solve(nev=self.nev, target=pred.mean(),
+                                          skipsym=self.skipsym, **kwargs)
+                    # match the computed eigenvalues with the predicted ones
+                    _, ind = linear_sum_assignment(np.abs(pred[:, None] - Lda[None, :]))
+            evs = op.solver.extract(ind)
+            lda = np.array([vp.lda for vp in evs])
+            if current is not None:
+                self.pred_err[p] = np.abs(lda - pred) / np.abs(lda)
+            self.lda[p] = lda
+            if op._lib != 'petsc':
+                v0 = np.sum([vp.x for vp in evs], axis=0)
+            # step control
+            if current is None or self.pred_err[p].max() > self.rtol:
+                with self.stats.timer('derivatives', p):
+                    # only the derivatives and the eigenvectors are stored along the sweep
+                    op.getDerivatives(evs, self.N, workers=self.workers, keep_factor=False)
+                current = evs
+                self.expansion.append(p)
+                self.eigs[p] = evs
+            self.stats.count('points')
+        return self
+
+
+class EPTracker:
+    """ Follow an EP when a second parameter mu varies.
+
+    At each step, the EP is predicted by linear extrapolation of the last two
+    EPs (or by the last EP for the first step). Then
+
+      - the derivatives of the two eigenvalues closest to the predicted merging
+      eigenvalue are computed at nu0 = predicted EP + `offset`, the predicted
+      eigenvalue is the shift target,
+      - the EP is located with `EP.locate` and refined with `EP.refine` (Newton).
+
+    The step is halved if the EP is not found, if Newton does not converge or
+    if the EP is far from the prediction (`jump`). Otherwise the step grows by
+    1.5 when Newton converges in at most 2 iterations, up to `dmu_max`.
+
+    Parameters
+    ----------
+    opFactory : callable
+        opFactory(nu, mu) returns the OP instance at nu0=nu for the second
+        parameter mu (numpy or scipysp to use Newton)
+    N : int
+        the number of derivatives of the eigenvalues
+    nev : int
+        the number of requested eigenpairs at each step
+    offset : complex, optional
+        the distance between nu0 and the predicted EP. The eigenvalues are
+        close to each other near the EP, nu0 should not be too close. By
+        default 5% of the modulus of the first EP
+    tol : float
+        the tolerance of `EP.locate`
+    refine : bool
+        if True, the EP is refined with Newton iterations
+    jump : float
+        the maximal distance, relative to |offset|, between the predicted and the
+        found EP
+    pb_type : string
+        the type of eigenvalue problem, see `OP.createSolver`
+    maxit : int
+        the maximal number of Newton iterations of `EP.refine`
+
+    Attributes
+    ----------
+    mu, nu, lda : array
+        the EP trajectory, nu[i] is the EP at mu[i] and lda[i] the merging eigenvalue
+    err : array
+        the last Newton correction, or the a posteriori error of `locate`
+        without Newton
+    stats : Stats
+        the profiling of the computations, see the `stats` module
+
+    Examples
+    --------
+    Follow the EP of the 3 dof system when the stiffness k5 varies
+    >>> from eastereig import gopts
+    >>> from eastereig.examples.ThreeDoF import ThreeDof
+    >>> factory = lambda nu, mu: ThreeDof([1., 2., 3, 1., mu, 1.+0j], nu, 5)
+    >>> gopts['silent'] = True
+    >>> tracker = EPTracker(factory, N=8, nev=3).run(0.8926160536+0.5977042446j,
+    ...                                               4.9932082+0.5587897j, 1., 1.2, dmu=0.05)
+    >>> gopts['silent'] = False
+    >>> tracker.mu[-1], len(tracker.mu) == len(tracker.nu)
+    (1.2, True)
+
+    The two eigenvalues coalesce at the last EP
+    >>> from scipy.linalg import eigvals
+    >>> op = factory(tracker.nu[-1], 1.2)
+    >>> lda = eigvals(op.K[0], -op.K[1])
+    >>> np.sort(abs(lda - tracker.lda[-1]))[1] < 1e-6
+    True
+    """
+
+    def __init__(self, opFactory, N=8, nev=4, offset=None, tol=1e-2, refine=True, jump=1.,
+                 pb_type='gen', maxit=3):
+        """ Init the tracker parameters.
+        """
+        self.opFactory = opFactory
+        self.N = N
+        self.nev = max(nev, 2)
+        self.offset = offset
+        self.tol = tol
+        self.refine = refine
+        self.jump = jump
+        self.pb_type = pb_type
+        self.maxit = maxit
+        self.stats = Stats(self.__class__.__name__)
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        try:
+            npts = len(self.mu)
+        except AttributeError:
+            npts = 0
+        return "Instance of {} with #{} points".format(self.__class__.__name__, npts)
+
+    def _step(self, mu, nu_p, lda_p, offset):
+        """ Locate and refine the EP at mu, starting from the prediction (nu_p, lda_p).
+
+        Returns
+        -------
+        res : tuple or None
+            (nu, lda, err, nit) or None if the EP is not found
+        """
+        from .ep import EP
+        nu0 = nu_p + offset
+        op = self.opFactory(nu0, mu)
+        op.createSolver(pb_type=self.pb_type)
+        Lda = op.solver.solve(nev=self.nev, target=lda_p)
+        ind = np.argsort(np.abs(Lda - lda_p))[:2]
+        ev1, ev2 = op.solver.extract(ind)
+        op.getDerivatives([ev1, ev2], self.N)
+        ep = EP(ev1, ev2)
+        EP_loc = ep.locate(tol=self.tol)
+        if not EP_loc:
+            return None
+        index = int(np.argmin(np.abs(np.array(EP_loc) - nu_p)))
+        if not self.refine:
+            # the merging eigenvalue is g/2 at the EP
+            lda = np.polynomial.polynomial.polyval(EP_loc[index] - ep.nu0, ep._dgTay)/2.
+            return EP_loc[index], lda, ep.aposterioriErr[index], 0
+        nu, lda = ep.refine(lambda nu: self.opFactory(nu, mu), index=index, maxit=self.maxit)
+        hist = ep.refine_history
+        if not np.isfinite(nu) or hist[-1] > 1e-8*max(abs(nu), 1.):
+            return None
+        return nu, lda, hist[-1], len(hist)
+
+    def run(self, nu_start, lda_start, mu_start, mu_stop, dmu, dmu_min=None, dmu_max=None):
+        """ Follow the EP from mu_start to mu_stop.
+
+        Parameters
+        ----------
+        nu_start, lda_start : complex
+            the EP and the merging eigenvalue at mu_start, e.g. from `EP.locate`
+        mu_start, mu_stop : float
+            the bounds of the second parameter
+        dmu : float
+            the initial step
+        dmu_min, dmu_max : float, optional
+            the bounds of the step, by default dmu/64 and 4*dmu
+
+        Returns
+        -------
+        self : EPTracker
+            the tracker, with the trajectory in the attributes
+        """
+        dmu = abs(dmu) * np.sign(mu_stop - mu_start)
+        dmu_min = abs(dmu)/64 if dmu_min is None else abs(dmu_min)
+        dmu_max = 4*abs(dmu) if dmu_max is None else abs(dmu_max)
+        offset = 0.05*abs(nu_start) if self.offset is None else self.offset
+        mu, nu, lda, err = [mu_start], [nu_start], [lda_start], [0.]
+        while (mu_stop - mu[-1])*np.sign(dmu) > 1e-12*max(abs(mu_stop), 1.):
+            mu_new = mu[-1] + dmu
+            if (mu_new - mu_stop)*np.sign(dmu) > 0:
+                mu_new = mu_stop
+            # linear predictor
+            if len(mu) > 1:
+                t = (mu_new - mu[-1]) / (mu[-1] - mu[-2])
+                nu_p, lda_p = nu[-1] + t*(nu[-1] - nu[-2]), lda[-1] + t*(lda[-1] - lda[-2])
+            else:
+                nu_p, lda_p = nu[-1], lda[-1]
+            with self.stats.timer('step', len(mu)):
+                res = self._step(mu_new, nu_p, lda_p, offset)
+            if res is None or abs(res[0] - nu_p) > self.jump*abs(offset):
+                # reject the step
+                self.stats.count('rejected')
+                dmu /= 2.
+                if abs(dmu) < dmu_min:
+                    raise RuntimeError('The EP is lost at mu={}, the step is too small.'.format(mu[-1]))
+                continue
+            mu.append(mu_new)
+            nu.append(res[0])
+            lda.append(res[1])
+            err.append(res[2])
+            if res[3] <= 2:
+                dmu = np.sign(dmu)*min(1.5*abs(dmu), dmu_max)
+        self.mu, self.nu, self.lda, self.err = (np.array(mu), np.array(nu),
+                                                np.array(lda), np.array(err))
+        return self
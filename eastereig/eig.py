@@ -35,11 +35,16 @@ from abc import ABC, abstractmethod
 
 import numpy as np
 import scipy as sp
-import time
+from scipy.special import binom
 
 from . import lda_func
 from eastereig import _petscHere, gopts,_CONST
 from eastereig.utils import pade
+from eastereig.reconstruction import (TaylorEvaluator, PadeEvaluator, PuiseuxEvaluator, AAFEvaluator,
+                                      partialSums, wynn)
+from eastereig.storage import ArrayStore, MemmapStore
+from eastereig.factor import factor_manager, MixedPrecisionSolver, splu
+from eastereig.stats import Stats
 
 if _petscHere==True:
     from slepc4py import SLEPc
@@ -55,9 +60,10 @@ def Eig(lib,*args,**kwargs):
     """ Define the target for factory the Eig Class depending of the linear algebra lib
     """
     try:
-        return EIG_FACTORY[lib](lib,*args,**kwargs)
-    except:
+        EigClass = EIG_FACTORY[lib]
+    except KeyError:
         raise KeyError(" 'lib' argument should be in {}".format(EIG_FACTORY.keys() ) )
+    return EigClass(lib,*args,**kwargs)
 
 
 # compatible with Python 2 *and* 3:
@@ -79,22 +85,104 @@ class AbstractEig(ABC):
         the list of the sucessive derivatives of x % nu
     dlda: list (if computated)
         the list of the sucessive derivatives of lda % nu
+    stats: Stats
+        the profiling of the derivatives computation, see the `stats` module
+
+    The derivatives are stored in python lists (`storage='list'`, default), in
+    contiguous arrays (`storage='array'`) or in a memory-mapped file for dx
+    (`storage='memmap'`, the file path can be given with `dxfile`), see the
+    `storage` module.
     """
-    
-    def __init__(self, lib, lda=None, x=None):
+
+    STORAGE = ('list', 'array', 'memmap')
+    """ Available storage of the derivatives
+    """
+
+    def __init__(self, lib, lda=None, x=None, storage='list', dxfile=None):
         """ Init the instance
         """
         self._lib=lib
         self.lda=lda
         self.x = x # must add normalisation here
+        self._storage = storage
+        self._dxfile = dxfile
+        self._factor = None
+        self._mixed = False
+        # the factorization must allow transposed solves
+        self._trans = False
+        # backward error of the mixed precision solves for each order
+        self.refine_err = {}
+        # profiling of the derivatives computation
+        self.stats = Stats(self.__class__.__name__)
+        self.dlda, self.dx = self._createStore()
+        # left eigenvector and its derivatives, see `getLeftDerivatives`
+        self.y, self.dy = None, None
+        # cached reconstruction evaluators, see `_reconstruction`
+        self._recon = {}
         
         # init derivative if note None
         if (lda != None)&(x is not None):            
-            self.dlda=[lda]
-            self.dx = [x]
+            self.dlda.append(lda)
+            self.dx.append(x)
+
+    def _createStore(self):
+        """ Create the empty containers of dlda and dx depending on the storage.
+        """
+        if self._storage not in self.STORAGE:
+            raise NotImplementedError('The storage {} is not available for {}'.format(self._storage,
+                                                                                      self.__class__.__name__))
+        if self._storage == 'array':
+            return ArrayStore(dtype=complex), ArrayStore(dtype=complex)
+        if self._storage == 'memmap':
+            return ArrayStore(dtype=complex), MemmapStore(dtype=complex, filename=self._dxfile)
+        return [], []
+
+    def _reserve(self, N):
+        """ Preallocate the storage for the derivatives up to order N.
+        """
+        if self._storage in ('array', 'memmap'):
+            self.dlda.reserve(N+1, ())
+            self.dx.reserve(N+1, self.x.shape)
+
+    def _exportD(self, eigenvec):
+        """ Get the dictionnary of the derivatives to export with `np.savez`.
+
+        With the memmap storage, the file of dx is flushed and only its path is
+        exported.
+        """
+        dic = {'dlda':np.asarray(self.dlda),'nu0':self.nu0,'lib':self._lib}
+        if eigenvec:
+            if self._storage == 'memmap':
+                self.dx.flush()
+                self.dx.keep()
+                dic.update({'dxfile':self.dx.filename, 'ndx':len(self.dx)})
+            else:
+                # export eigenvector derivatives
+                dic.update({'dx':self.dx})
+        return dic
+
+    def _loadD(self, f, eigenvec):
+        """ Load the derivatives from the dictionnary created by `_exportD`.
+        """
+        if eigenvec:
+            if 'dxfile' in f.files:
+                # reuse the file, no copy
+                self._storage = 'memmap'
+                self.dlda = ArrayStore(dtype=complex)
+                self.dx = MemmapStore.open(str(f['dxfile']), int(f['ndx']))
+                dx = None
+                x = self.dx[0]
+            else:
+                dx = list (f['dx'])
+                x = dx[0]
         else:
-            self.dlda=[]
-            self.dx = []
+            dx,x = None,None
+        # add attribute    
+        self.addD(f['dlda'],dx)
+        self.nu0=complex(f['nu0'])
+        self.lda=f['dlda'][0]
+        self.x = x
+        self._lib=str(f['lib'])
     
     def __repr__(self):
         """ Define the representation of the class    
@@ -140,23 +228,350 @@ class AbstractEig(ABC):
         if dx:
             self.dx.extend(dx)
     
-    @abstractmethod
-    def getDerivatives(self, N, L):
+    def getDerivatives(self, N, op, keep_factor=False, mixed_precision=False):
         """ Compute the successive derivative of an eigenvalue of an OP instance
         
+        If the object already holds derivatives computed at `op.nu0`, only the
+        orders `len(dlda)` to N are computed. By default, the factorization of the
+        bordered matrix is released at the end. If `keep_factor` is True, it is
+        kept between the calls and is reused as long as the same `op` is used,
+        until `releaseFactor` is called.
+
         Parameters
         -----------
         N: int
             the number derivative to compute
-        L: OP
+        op: OP
             the operator OP instance that describe the eigenvalue problem
+        keep_factor: bool
+            keep the factorization of the bordered matrix to extend the
+            derivatives later, it must then be freed with `releaseFactor`.
+        mixed_precision: bool
+            factorize the bordered matrix in single precision and recover the
+            double precision with iterative refinement (numpy and scipysp).
+            The backward error of each order is stored in `refine_err`.
             
         RHS derivative must start at n=1 for 1st derivatives
         """
+        for _ in self.iterDerivatives(N, op, keep_factor, mixed_precision):
+            pass
+
+    def iterDerivatives(self, N, op, keep_factor=False, mixed_precision=False):
+        """ Generator version of `getDerivatives`.
+
+        Each derivative is solved only when the next value is requested, it is
+        stored in `dlda` and `dx` and then yielded. The iteration can be stopped
+        at any order and resumed later with `getDerivatives` or `iterDerivatives`.
+
+        Parameters
+        -----------
+        N: int
+            the maximal number derivative to compute
+        op: OP
+            the operator OP instance that describe the eigenvalue problem
+        keep_factor: bool
+            keep the factorization of the bordered matrix to extend the
+            derivatives later, it must then be freed with `releaseFactor`.
+        mixed_precision: bool
+            factorize the bordered matrix in single precision and recover the
+            double precision with iterative refinement (numpy and scipysp).
+            The backward error of each order is stored in `refine_err`.
+
+        Yields
+        ------
+        dlda_n : complex
+            the n-th derivative of the eigenvalue
+        dx_n : vector
+            the n-th derivative of the eigenvector
+        """
+        start = self._startDerivatives(N, op, mixed_precision)
+        # if N > 1 loop for higher order terms
+        self._print('> Linear solve...')
+        try:
+            for n in range(start, N+1):
+                # compute RHS
+                with self.stats.timer('getRHS', n):
+                    Ftemp=op.getRHS(self,n)
+                # solution contains [dx, dlda]
+                with self.stats.timer('solve', n):
+                    derivee, dx = self._solveBordered(Ftemp)
+                if self._mixed:
+                    self._checkRefinement(n)
+                # store the value
+                self.dlda.append(derivee)
+                self.dx.append(dx)
+                self._log(n, ' ')
+                yield self.dlda[n], self.dx[n]
+            self._log('\n')
+        finally:
+            if self._storage == 'memmap':
+                self.dx.flush()
+            if not keep_factor:
+                self.releaseFactor()
+
+    def _startDerivatives(self, N, op, mixed_precision=False):
+        """ Prepare the computation of the derivatives up to order N.
+
+        If needed, normalize the eigenvector and factorize the bordered matrix.
+        The derivatives computed at an other value of nu0 are removed.
+
+        Returns
+        -------
+        start : int
+            the first derivative order to compute
+        """
+        if len(self.dlda) > 1 and getattr(self, 'nu0', None) != op.nu0:
+            # derivatives computed at another point, restart from the eigenpair
+            self._truncateD(1)
+            self.releaseFactor()
+            self.y, self.dy = None, None
+        if len(self.dlda) > len(self.dx):
+            # remove the eigenvalue derivatives obtained with the 2n+1 rule
+            self._truncate(self.dlda, len(self.dx))
+        self._reserve(N)
+        if mixed_precision and self._lib == 'petsc':
+            raise NotImplementedError('Mixed precision is not available with petsc')
+        factor = self._factor
+        if ((factor is None) or (factor[0] is not op) or (factor[1] != op.nu0)
+                or (factor[3] != mixed_precision) or (self._trans and not factor[4])):
+            # get nu0 value where the derivative are computed
+            self.nu0 = op.nu0
+            self._mixed = mixed_precision
+            with self.stats.timer('factorize', 0):
+                handle = self._factorize(op)
+            self._factor = (op, op.nu0, handle, mixed_precision, self._trans)
+        return len(self.dlda)
+
+    def _mixedSolver(self, Bord, factorize):
+        """ Create the single precision solver with iterative refinement.
+        """
+        return MixedPrecisionSolver(Bord, factorize, tol=gopts['refine_tol'],
+                                    maxit=gopts['refine_maxit'])
+
+    def _checkRefinement(self, n, left=False):
+        """ Store the backward error of the refined solve of order n and warn
+        if the iterative refinement does not converge.
+        """
+        solver = self._factor[2]
+        self.stats.count('refine_steps', solver.it, order=n)
+        if not left:
+            self.refine_err[n] = solver.err
+        if solver.err > solver.tol:
+            self._print('> Warning : iterative refinement not converged at order {}'
+                        ' (err={:.2e}), use mixed_precision=False'.format(n, solver.err))
+
+    def _truncateD(self, n):
+        """ Keep only the n first derivatives.
+        """
+        for d in (self.dlda, self.dx):
+            self._truncate(d, n)
+
+    @staticmethod
+    def _truncate(d, n):
+        """ Keep only the n first values of a list or of an `ArrayStore`.
+        """
+        if hasattr(d, 'truncate'):
+            d.truncate(n)
+        else:
+            del d[n:]
+
+    @staticmethod
+    def _lastDiff(table):
+        """ Get the modulus of the difference between the two last rows of a table.
+        """
+        if len(table) < 2:
+            return np.full(table.shape[1:], np.inf)
+        return abs(table[-1] - table[-2])
+
+    def releaseFactor(self):
+        """ Release the factorization of the bordered matrix.
+        """
+        self._factor = None
+
+    @abstractmethod
+    def _factorize(self, op):
+        """ Normalize the eigenvector, create and factorize the bordered matrix.
+
+        Returns
+        -------
+        handle : object
+            the data used by `_solveBordered`
+        """
         pass
-        
-        
-    def taylor(self, points, n=-1):
+
+    @abstractmethod
+    def _solveBordered(self, F):
+        """ Solve the bordered system with the RHS F.
+
+        Returns
+        -------
+        dlda : complex
+            the eigenvalue derivative
+        dx : vector
+            the eigenvector derivative
+        """
+        pass
+
+    def _solveBorderedT(self, F=None, c=0.):
+        """ Solve the transposed bordered system with the RHS [F, c], F=None
+        stands for a null vector.
+
+        Returns
+        -------
+        y : vector
+            the vector part of the solution
+        """
+        raise NotImplementedError('Transposed solve is not available for {}'.format(self.__class__.__name__))
+
+    def getLeftDerivatives(self, N, op, keep_factor=False):
+        r""" Compute the left eigenvector `y` and its successive derivatives `dy`
+        up to order N.
+
+        The left eigenvector satisfies \( \mathbf{y}^T \mathbf{L} = 0 \) and is
+        normalized such that \( \mathbf{y}^T \partial_\lambda \mathbf{L} \mathbf{x} = 1 \).
+        All the systems are solved with the transposed bordered matrix, thus the
+        factorization used for the right eigenvector is reused. The right
+        derivatives are computed up to order N if needed. With scipysp, the
+        bordered matrix is factorized with SuperLU, since the UMFPACK solves
+        cannot be transposed.
+
+        Parameters
+        -----------
+        N: int
+            the number derivative to compute
+        op: OP
+            the operator OP instance that describe the eigenvalue problem
+        keep_factor: bool
+            keep the factorization of the bordered matrix, see `getDerivatives`
+        """
+        # eigenvalue derivatives and bordered matrix factorization
+        self._trans = True
+        self.getDerivatives(N, op, keep_factor=True, mixed_precision=self._mixed)
+        try:
+            self._leftDerivatives(N, op)
+        finally:
+            if not keep_factor:
+                self.releaseFactor()
+
+    def _leftDerivatives(self, N, op):
+        """ Solve the left systems up to order N with the current factorization.
+        """
+        if self.dy is None or self.dy is self.dx:
+            self.dy = [] if self._storage == 'list' else ArrayStore(dtype=complex)
+        if len(self.dy) == 0:
+            with self.stats.timer('solve_left', 0):
+                self.y = self._solveBorderedT(None, 1.)
+            self.dy.append(self.y)
+        # (\partial_\lambda L)^T y, the lda^(n) term is not in the RHS
+        L1Ty = op.createDL_ldax(self, left=True)
+        for n in range(len(self.dy), N+1):
+            with self.stats.timer('getRHS_left', n):
+                Ftemp = op.getRHS(self, n, left=True)
+            with self.stats.timer('solve_left', n):
+                self.dy.append(self._solveBorderedT(Ftemp - self.dlda[n]*L1Ty))
+            if self._mixed:
+                self._checkRefinement(n, left=True)
+
+    def getDerivativesTwoSided(self, N, op, symmetric=False, keep_factor=False):
+        r""" Compute the eigenvalue derivatives up to order N from the right and
+        left eigenvector derivatives up to order n = N//2 only.
+
+        The function \( \sum_i f_i(\lambda) a_i(\nu) \), where
+        \( a_i = \tilde{\mathbf{y}}^T \mathbf{K}_i \tilde{\mathbf{x}} \) is obtained with
+        the truncated Taylor series of x and y, vanishes at the eigenvalue up
+        to order 2n+1 (stationarity of the two-sided Rayleigh functional).
+        Its successive derivatives give the eigenvalue derivatives of order n+1
+        to 2n+1, see `OP.getBilinearSeries`.
+
+        The number of solves is only halved if the operator is symmetric
+        (\( \mathbf{K}_i^T = \mathbf{K}_i \)): x is then also a left eigenvector and
+        only n bordered solves are needed instead of N. Otherwise, n right and
+        n+1 left solves are needed, i.e. about as many as `getDerivatives(N)`; they
+        reuse the same factorization of the bordered matrix. In both cases,
+        `OP.getBilinearSeries` adds about 3/2 n**2 matrix-vector products per matrix K_i.
+
+        Only full vectors are supported (numpy and scipysp libs). The eigenvector
+        derivatives `dx` are computed only up to order n, further calls to
+        `getDerivatives` will remove the derivatives of `dlda` obtained with
+        this method.
+
+        Parameters
+        -----------
+        N: int
+            the number eigenvalue derivative to compute
+        op: OP
+            the operator OP instance that describe the eigenvalue problem
+        symmetric: bool
+            use x as left eigenvector if the operator is symmetric
+        keep_factor: bool
+            keep the factorization of the bordered matrix, see `getDerivatives`
+        """
+        if self._lib == 'petsc':
+            raise NotImplementedError('The two-sided derivatives are not available with petsc')
+        n = N // 2
+        if symmetric:
+            self.getDerivatives(n, op, keep_factor=keep_factor, mixed_precision=self._mixed)
+            self.y, self.dy = self.x, self.dx
+        else:
+            self.getLeftDerivatives(n, op, keep_factor=keep_factor)
+        with self.stats.timer('bilinear', N):
+            a = op.getBilinearSeries(self, N)
+        dlda = list(self.dlda)
+        # y^T (\partial_\lambda L) x
+        den = sum(lda_func.dfdlda(f)(self.lda)*a[i, 0] for i, f in enumerate(op.flda))
+        for k in range(len(dlda), N+1):
+            S = 0.
+            for i, f in enumerate(op.flda):
+                if f is None:
+                    S += a[i, k]
+                else:
+                    # the term with lda^(k) is skipped by the flda convention
+                    S += sum(binom(k, m)*f(m, k, dlda)*a[i, k-m] for m in range(k+1))
+            dlda.append(-S/den)
+            self.dlda.append(dlda[k])
+
+    # logging of the derivatives computation
+    _VERBOSE = False
+
+    def _print(self, *args):
+        """ Print a message, except in silent mode.
+        """
+        if not gopts['silent']:
+            print(*args)
+
+    def _log(self, *args):
+        """ Print a message only if the class is verbose, the timings are
+        recorded in `stats`.
+        """
+        if self._VERBOSE:
+            self._print(*args)
+
+    def _reconstruction(self, kind, n):
+        """ Get the cached evaluator of the Taylor or Padé reconstruction with n terms.
+
+        The coefficients are computed once, the cache is refreshed if the
+        derivatives or `nu0` change.
+        """
+        if n == -1:
+            n = len(self.dlda)
+        key = (kind, n)
+        check = (len(self.dlda), self.nu0, complex(self.dlda[min(n, len(self.dlda)) - 1]))
+        cached = self._recon.get(key)
+        if cached is not None and cached[0] == check:
+            return cached[1]
+        # get Taylor coef in ascending order
+        dlda = np.array(self.dlda[:n], dtype=complex)
+        Df = dlda / sp.special.factorial(np.arange(len(dlda)))
+        if kind == 'taylor':
+            ev = TaylorEvaluator(Df, self.nu0)
+        else:
+            # order d(0) -> d(n) for padé
+            p, q = pade(Df, n//2)
+            ev = PadeEvaluator(p.coeffs[::-1], q.coeffs[::-1], self.nu0)
+        self._recon[key] = (check, ev)
+        return ev
+
+    def taylor(self, points, n=-1, out=None, chunk=None, workers=None):
         """
         Evaluate the Taylor expansion of order n at `points`.
         
@@ -167,6 +582,9 @@ class AbstractEig(ABC):
         n : int            
             The number of terms considered in the expansion
             if no value is given or if n=-1, the size of the array dlda is considered, 
+        out, chunk, workers : optional
+            the output buffer, the chunk size and the number of threads,
+            see `reconstruction.Evaluator`
         
         Returns
         -------
@@ -177,17 +595,9 @@ class AbstractEig(ABC):
         if n>len(self.dlda):
             print('Run getDerivative before...\n')
 
-        if n==-1: n= len(self.dlda)   
-        # converting to np.array
-        dlda = np.array(self.dlda,dtype=np.complex)
-        # get Taylor coef in ascending order
-        Df = dlda[0:n] / sp.special.factorial(np.arange(n))
-        # polyval require higher degree first
-        tay = sp.polyval(Df[::-1],points-self.nu0)
+        return self._reconstruction('taylor', n)(points, out=out, chunk=chunk, workers=workers)
         
-        return tay
-        
-    def pade(self,points,n=-1):
+    def pade(self, points, n=-1, out=None, chunk=None, workers=None):
         """
         Evaluate the Padé expansion of order [n//2,n//2] at `points`.
         
@@ -198,6 +608,10 @@ class AbstractEig(ABC):
         n : int            
             The number of terms considered in the expansion
             if no value is given or if n=-1, the size of the array dlda is considered
+        out, chunk, workers : optional
+            the output buffer, the chunk size and the number of threads,
+            see `reconstruction.Evaluator`
+
         Returns
         -------
         pad : array_like
@@ -207,21 +621,13 @@ class AbstractEig(ABC):
         if len(self.dlda)==1:
             print('Run getDerivative before...\n')
 
-        if n==-1: n= len(self.dlda)   
-
-        # converting to np.array
-        dlda = np.array(self.dlda,dtype=np.complex)
-        # get Taylor coef in ascending order
-        Df = dlda[0:n] / sp.special.factorial(np.arange(n))
-        # order d(0) -> d(n) for padé
-        p, q = pade(Df, n//2)
-        pad = p(points-self.nu0) / q(points-self.nu0)
-
-        return pad
+        return self._reconstruction('pade', n)(points, out=out, chunk=chunk, workers=workers)
         
-    def puiseux(self,ep,points,index=0,n=-1):
+    def puiseux(self, ep, points, index=0, n=-1, out=None, chunk=None, workers=None):
         """
         Evaluate the Puiseux expansion with n terms at `points` .
+
+        The series is evaluated with Horner scheme in sqrt(nu - nu*).
         
         Parameters
         ----------
@@ -234,41 +640,75 @@ class AbstractEig(ABC):
         n : integer
           The number of terms considered in the expansion
           if no value is given or if n=-1, the size of the array dlda is considered.
+        out : tuple, optional
+            the two output buffers
+        chunk, workers : int, optional
+            the chunk size and the number of threads, see `reconstruction.Evaluator`
          
         Returns
         -------
         f1,f2 : array_like 
             the Puiseux series evaluation of both eigenvalue
         """
-        #if points.dtype
-        #points_ = points.astype(np.complex)
         try: 
             ep.a
         except:
             print('warning need to compute Puiseux coef before at `index`...\n')
             ep.getPuiseux(index=index)
-            
-                   
-        if n >-1:            
-            a1 =ep.a[index][:n]
-        else:
-            n = len(ep.a[index])
-            a1 = ep.a[index]
-            
-        EP_loc = ep.EP_loc[index]    
-        a2=a1.copy()
-        
-        f1=np.ones(points.shape,dtype=np.complex)*a1[0]
-        f2=np.ones(points.shape,dtype=np.complex)*a1[0]
-        for k in range(1,n):
-            # reconstruct the 2 solutions
-            f1 +=  a1[k]*np.power(points-EP_loc, k/2.)
-            f2 +=  a1[k]*np.power(points-EP_loc, k/2.)*(-1)**(k)
-
-        return (f1,f2)
-        
 
-    def anaAuxFunc(self,ep,points,n=-1):
+        a1 = ep.a[index][:n] if n > -1 else ep.a[index]
+        ev = PuiseuxEvaluator(a1, ep.EP_loc[index])
+        return ev(points, out=out, chunk=chunk, workers=workers)
+
+    def convergenceTable(self, points, kind='taylor', n=-1, ep=None, index=0):
+        """
+        Evaluate the reconstructions for all the truncation orders 1..n at `points`, in one pass.
+
+        The Taylor and Puiseux series are obtained by cumulative partial sums and
+        the Padé approximants by Wynn's epsilon algorithm, see
+        `reconstruction.partialSums` and `reconstruction.wynn`. The entry n-1 of
+        the table is the same as `taylor`, `pade` or `puiseux` with n terms.
+
+        Parameters
+        ----------
+        points : array_like
+            the value where the series is evaluated. Give the absolute value, not the relative % nu0.
+        kind : str
+            'taylor', 'pade' or 'puiseux'
+        n : int
+            The maximum number of terms, if n=-1, the size of the array dlda
+            (or of the Puiseux coefficients) is considered
+        ep : EP instance, optional
+            The EP instance that store Puiseux coefficients, required for 'puiseux'
+        index : int
+            the index of the EP for 'puiseux'
+
+        Returns
+        -------
+        table : array or tuple of arrays
+            the reconstructions, with shape (n,) + points.shape. Tuple of both
+            branches for 'puiseux'
+        err : array or tuple of arrays
+            the convergence estimate at each point, the modulus of the difference
+            between the two last orders
+        """
+        if kind == 'puiseux':
+            a = ep.a[index][:n] if n > -1 else ep.a[index]
+            s = np.sqrt(np.asarray(points) - ep.EP_loc[index])
+            tables = partialSums(a, s), partialSums(a, -s)
+            return tables, tuple(self._lastDiff(t) for t in tables)
+        if n == -1:
+            n = len(self.dlda)
+        dlda = np.array(self.dlda[:n], dtype=complex)
+        Df = dlda / sp.special.factorial(np.arange(len(dlda)))
+        table = partialSums(Df, np.asarray(points) - self.nu0)
+        if kind == 'pade':
+            table = wynn(table)
+        elif kind != 'taylor':
+            raise ValueError("kind must be 'taylor', 'pade' or 'puiseux'")
+        return table, self._lastDiff(table)
+
+    def anaAuxFunc(self, ep, points, n=-1, out=None, chunk=None, workers=None):
         r"""
         Evalaute the analytic auxiliary functions reconstruction, based on g and h
         Taylor expansion at `points`.
@@ -299,6 +739,10 @@ class AbstractEig(ABC):
         n: integer [optional]
             The number of terms considered in the expansion
             if no value is given or if n=-1, the size of the array dlda is considered.
+        out : tuple, optional
+            the two output buffers
+        chunk, workers : int, optional
+            the chunk size and the number of threads, see `reconstruction.Evaluator`
 
         Returns
         -------
@@ -306,9 +750,8 @@ class AbstractEig(ABC):
             the reconstructed eigenvalue pair
         """
 
-        # compute the analytic auxiliary functions g and h from lda dérivatives
-        ep._dh()
-        ep._dg()
+        # get the analytic auxiliary functions g and h from lda dérivatives (memoized)
+        ep._update()
         if n>-1:
             # truncate
             dgTay = ep._dgTay[:n]
@@ -317,12 +760,8 @@ class AbstractEig(ABC):
             dgTay = ep._dgTay
             dhTay = ep._dhTay
 
-        # evaluate Taylor series
-        mapg = sp.polyval(dgTay[::-1],points-self.nu0)
-        maph = sp.polyval(dhTay[::-1],points-self.nu0)
-        ldap = 0.5*(mapg+np.sqrt(maph))
-        ldam = 0.5*(mapg-np.sqrt(maph))
-        return ldap,ldam
+        ev = AAFEvaluator(dgTay, dhTay, self.nu0)
+        return ev(points, out=out, chunk=chunk, workers=workers)
 
     @staticmethod
     def _spellcheck():
@@ -338,6 +777,9 @@ class PetscEig(AbstractEig):
     
     Concrete class for petsc matrix
     """
+
+    # petsc vectors are distributed, no contiguous storage
+    STORAGE = ('list',)
      
     def export(self,filename,eigenvec=True):
         """ Export the eigenvalue and the eigenvector derivatives (if eigenvect=True) into a file
@@ -446,23 +888,30 @@ class PetscEig(AbstractEig):
 
         return ksp
             
-    def getDerivatives(self,N,op):
-        """ Compute the successive derivative of an eigenvalue of an OP instance
-        
-        Parameters
-        -----------
-        N: int
-            the number derivative to compute
-        L: OP
-            the operator OP instance that describe the eigenvalue problem
-            
-        RHS derivative must start at n=1 for 1st derivatives
+    _VERBOSE = True
+
+    def _print(self, *args):
+        """ Print a message, only on the 1st process, except in silent mode.
+        """
+        if not gopts['silent']:
+            Print(*args)
+
+    def releaseFactor(self):
+        """ Release the factorization of the bordered matrix.
+        """
+        if self._factor is not None:
+            h = self._factor[2]
+            if 'slot' in h:
+                # the ksp is given back to the pool for the next factorization
+                h['Bord'].destroy()
+                factor_manager.petscRelease(h['slot'])
+            else:
+                h['ksp'].destroy()
+        self._factor = None
+
+    def _factorize(self, op):
+        """ Normalize the eigenvector, create and factorize the bordered matrix.
         """
-        # create communicator for mpi command
-        comm = PETSc.COMM_WORLD.tompi4py()
-        
-        # get nu0 value where the derivative are computed
-        self.nu0 = op.nu0
         # construction de la matrice de l'opérateur L
         L=op.createL(self.lda) 
         # normalization condition (push elsewhere : différente méthode, indépendace vs type )
@@ -503,58 +952,57 @@ class PetscEig(AbstractEig):
         C.convert(PETSc.Mat.Type.AIJ,Bord)
         
         # initialisation du solveur
-        ksp = self._InitDirectSolver(Bord,name=gopts['direct_solver_name']) # defaut mumps, non symetric...
         u = Bord.createVecLeft()
-       
-        
-   
-        """ 
+        if gopts['factor_reuse']:
+            # reuse the symbolic analysis of a released KSP with the same pattern
+            slot = factor_manager.petscFactor(Bord, lambda A: self._InitDirectSolver(A, name=gopts['direct_solver_name']))
+            ksp = slot['ksp']
+        else:
+            slot = None
+            ksp = self._InitDirectSolver(Bord,name=gopts['direct_solver_name']) # defaut mumps, non symetric...
+
+        Zero = PETSc.Vec().create()
+        Zero.setSizes(size=(None,1)) # free for local, global size=1
+        Zero.setUp()
+        Zero.setValue(0,0+0j)
+        # create communicator for mpi command
+        comm = PETSc.COMM_WORLD.tompi4py()
+        h = {'ksp':ksp, 'u':u, 'ind':ind, 'Zero':Zero, 'comm':comm}
+        if slot is not None:
+            h.update({'slot':slot, 'Bord':Bord})
+        return h
+
+    def _solveBordered(self, Ftemp):
+        """ Solve the bordered system with the RHS Ftemp.
+
         getSubVector :
         This function may return a subvector without making a copy, therefore it 
         is not safe to use the original vector while modifying the subvector. 
         Other non-overlapping subvectors can still be obtained from X using this function. 
         """
+        h = self._factor[2]
+        u, ind = h['u'], h['ind']
+        Fnest= PETSc.Vec().createNest([Ftemp, h['Zero']])
+        # monolithique (no copy)
+        # getArray Returns a pointer to a contiguous array that contains this processor's portion of the vector data
+        F=PETSc.Vec().createWithArray(Fnest.getArray()) # don't forget () !
         
-        # if N > 1 loop for higher order terms
-        Print('> Linear solve...')
-        Zero = PETSc.Vec().create()
-        Zero.setSizes(size=(None,1)) # free for local, global size=1
-        Zero.setUp()
-        Zero.setValue(0,0+0j)
-        # n start now at 1 for uniformization
-        for n in range(1,N+1):                       
-            # compute RHS
-            tic = time.time() # init timer 
-            Ftemp=op.getRHS(self,n)
-            Print("              # getRHS real time :", time.time()-tic) 
-            
-            Fnest= PETSc.Vec().createNest([Ftemp, Zero])
-            # monolithique (no copy)
-            # getArray Returns a pointer to a contiguous array that contains this processor's portion of the vector data
-            F=PETSc.Vec().createWithArray(Fnest.getArray()) # don't forget () !
-            
-            # n=0 get LU and solve, then solve with stored LU 
-            # solution u contains [dx, dlda]) 
-            tic = time.time() # init timer 
-            #F.view(PETSc.Viewer.STDOUT())
-            ksp.solve(F, u) 
-            Print("              # solve LU real time :", time.time()-tic) 
-            # store results as list
-            # Print('indice :', ind[0][1].getIndices(),u[ind[0][1].getIndices()] )
-            # self.dlda.append( np.asscalar( u[ind[0][1].getIndices()] ) )     # get value from IS, pb car //
-            # get value from IS
-            derivee=u[ind[0][1].getIndices()]      
-            
-            if len(derivee)==0:         
-                derivee=np.array([0.],dtype=np.complex64)
-            # send the non empty value to all process
-            derivee = comm.allreduce(derivee, MPI.SUM)
-            # get lda^(n)                        
-            self.dlda.append( derivee[0]  )                    
-            self.dx.append(  PETSc.Vec().createWithArray( u.getSubVector(ind[0][0]).copy() )  ) # get pointer from IS, need copy
-            Print(n)
-
-        Print('\n')
+        # the LU is computed at the 1st solve, then solve with stored LU 
+        # solution u contains [dx, dlda]) 
+        #F.view(PETSc.Viewer.STDOUT())
+        h['ksp'].solve(F, u) 
+        # store results as list
+        # Print('indice :', ind[0][1].getIndices(),u[ind[0][1].getIndices()] )
+        # self.dlda.append( np.asscalar( u[ind[0][1].getIndices()] ) )     # get value from IS, pb car //
+        # get value from IS
+        derivee=u[ind[0][1].getIndices()]      
+        
+        if len(derivee)==0:         
+            derivee=np.array([0.],dtype=np.complex64)
+        # send the non empty value to all process
+        derivee = h['comm'].allreduce(derivee, MPI.SUM)
+        # get lda^(n)                        
+        return derivee[0], PETSc.Vec().createWithArray( u.getSubVector(ind[0][0]).copy() ) # get pointer from IS, need copy
    
         
             
@@ -581,10 +1029,7 @@ class NumpyEig(AbstractEig):
         The created object depend on the matrix format lib.             
         """
         # export eigenvalue derivatives            
-        dic = {'dlda':self.dlda,'nu0':self.nu0,'lib':self._lib}
-        if eigenvec:
-            # export eigenvector derivatives
-            dic.update({'dx':self.dx})
+        dic = self._exportD(eigenvec)
         np.savez(filename,**dic)
        
             
@@ -603,36 +1048,12 @@ class NumpyEig(AbstractEig):
       
         
         f=np.load(filename)
-        Nderiv=len(f['dlda'])
-
-        if eigenvec:
-            dx = list (f['dx'])
-            x = dx[0]
-        else:
-            dx,x = None,None
-        # add attribute    
-        self.addD(f['dlda'],dx)
-        self.nu0=np.complex(f['nu0'])
-        self.lda=f['dlda'][0]
-        self.x = x
-        self._lib=f['lib']
+        self._loadD(f, eigenvec)
             
             
-    def getDerivatives(self,N,op):
-        """ Compute the successive derivative of an eigenvalue of an OP instance
-        
-        Parameters
-        -----------
-        N: int
-            the number derivative to compute
-        op: OP
-            the operator OP instance that describe the eigenvalue problem
-            
-        RHS derivative must start at n=1 for 1st derivatives
+    def _factorize(self, op):
+        """ Normalize the eigenvector, create and factorize the bordered matrix.
         """
-        
-        # get nu0 value where the derivative are computed
-        self.nu0 = op.nu0
         # construction de la matrice de l'opérateur L, ie L.L
         L = op.createL(self.lda)        
         # normalization condition (push elsewhere : différente méthode, indépendace vs type )
@@ -649,38 +1070,41 @@ class NumpyEig(AbstractEig):
         # bordered
         # ---------------------------------------------------------------------
         # Same matrix to factorize for all RHS   
-        Zer = np.zeros(shape=(1,1), dtype=np.complex) 
-        Zerv = np.zeros(shape=(1,), dtype=np.complex) 
+        Zer = np.zeros(shape=(1,1), dtype=complex) 
         Bord = sp.bmat([[ L             , L1x.reshape(-1,1) ],
                         [ v.reshape(1,-1) , Zer]]) # reshape is to avoid (n,) in bmat
-                
-        # if N > 1 loop for higher order terms
-        print('> Linear solve...')
-        # n start now at 1 for uniformization
-        for n in range(1,N+1):                       
-            # compute RHS
-            tic = time.time() # init timer 
-            Ftemp=op.getRHS(self,n)
-            #F= sp.bmat([Ftemp, Zerv]).reshape(-1,1)
-            F= np.concatenate((Ftemp, Zerv))
-            # print("              # getRHS real time :", time.time()-tic)             
-           
-            tic = time.time() # init timer  
-            if n==1:
-                # compute the lu factor
-                lu,piv = sp.linalg.lu_factor(Bord)
-            # Forward and back substitution, u contains [dx, dlda]) 
-            u = sp.linalg.lu_solve((lu,piv),F)
-            # print("              # solve LU real time :", time.time()-tic) 
-            
-            # get lda^(n)
-            derivee=u[-1]                             
-            # store the value                        
-            self.dlda.append( derivee  )                 
-            self.dx.append(  u.copy()[:-1]   ) 
-            # print(n, ' ')
-
-        # print('\n')
+        if self._mixed:
+            def factorize(A):
+                lu = sp.linalg.lu_factor(A)
+                return lambda b, trans='N': sp.linalg.lu_solve(lu, b, trans=int(trans != 'N'))
+            return self._mixedSolver(np.asarray(Bord), factorize)
+        # compute the lu factor
+        return sp.linalg.lu_factor(Bord)
+
+    def _solveBordered(self, Ftemp):
+        """ Solve the bordered system with the RHS Ftemp.
+        """
+        Zerv = np.zeros(shape=(1,), dtype=complex) 
+        F= np.concatenate((Ftemp, Zerv))
+        # Forward and back substitution, u contains [dx, dlda]) 
+        if self._mixed:
+            u = self._factor[2](F)
+        else:
+            u = sp.linalg.lu_solve(self._factor[2],F)
+        # get lda^(n)
+        return u[-1], u[:-1]
+
+    def _solveBorderedT(self, F=None, c=0.):
+        """ Solve the transposed bordered system with the RHS [F, c].
+        """
+        if F is None:
+            F = np.zeros(self.x.shape, dtype=complex)
+        F = np.concatenate((F, [c]))
+        if self._mixed:
+            u = self._factor[2](F, trans='T')
+        else:
+            u = sp.linalg.lu_solve(self._factor[2], F, trans=1)
+        return u[:-1]
    
 # end class NumpyEig 
             
@@ -705,10 +1129,7 @@ class ScipyspEig(AbstractEig):
         """
         # same as numpy because eigs returns full vector
         # export eigenvalue derivatives            
-        dic = {'dlda':self.dlda,'nu0':self.nu0,'lib':self._lib}
-        if eigenvec:
-            # export eigenvector derivatives
-            dic.update({'dx':self.dx})
+        dic = self._exportD(eigenvec)
         np.savez(filename,**dic)
        
             
@@ -727,36 +1148,14 @@ class ScipyspEig(AbstractEig):
         # same as numpy because eigs returns full vector
         
         f=np.load(filename)
-        Nderiv=len(f['dlda'])
-
-        if eigenvec:
-            dx = list (f['dx'])
-            x = dx[0]
-        else:
-            dx,x = None,None
-        # add attribute    
-        self.addD(f['dlda'],dx)
-        self.nu0=np.complex(f['nu0'])
-        self.lda=f['dlda'][0]
-        self.x = x
-        self._lib=f['lib']
+        self._loadD(f, eigenvec)
             
             
-    def getDerivatives(self,N,op):
-        """ Compute the successive derivative of an eigenvalue of an OP instance
-        
-        Parameters
-        -----------
-        N: int
-            the number derivative to compute
-        L: OP
-            the operator OP instance that describe the eigenvalue problem
-            
-        RHS derivative must start at n=1 for 1st derivatives
+    _VERBOSE = True
+
+    def _factorize(self, op):
+        """ Normalize the eigenvector, create and factorize the bordered matrix.
         """
-        
-        # get nu0 value where the derivative are computed
-        self.nu0 = op.nu0
         # construction de la matrice de l'opérateur L, ie L.L
         L = op.createL(self.lda) 
         # normalization condition (push elsewhere : différente méthode, indépendace vs type )
@@ -768,43 +1167,41 @@ class ScipyspEig(AbstractEig):
 
         # constrution du vecteur (\partial_\lambda L)x, ie L.L1x
         L1x = op.createDL_ldax(self) # FIXME change, now with return         
-        Zerv = np.zeros(shape=(1,), dtype=np.complex) 
         # bordered
         # ---------------------------------------------------------------------
         # Same matrix to factorize for all RHS, conversion to scr for scipy speed
         Bord = sp.sparse.bmat( [[ L             , L1x.reshape(-1,1) ],
                          [ v.reshape(1,-1) , None] ] ).tocsc() # reshape is to avoid (n,) in bmat
-                
-        # if N > 1 loop for higher order terms
-        print('> Linear solve...')
-        # n start now at 1 for uniformization
-        for n in range(1, N+1):
-            # compute RHS
-            tic = time.time() # init timer 
-            Ftemp=op.getRHS(self, n)
-            #F= sp.bmat([Ftemp, Zerv]).reshape(-1,1)
-            F= np.concatenate((Ftemp, Zerv))
-            print("              # getRHS real time :", time.time()-tic)             
-           
-            tic = time.time() # init timer  
-            if n == 1:
-                # umfpack is not in scipy but need to be installed with scikit-umfpack
-                # if not present, scipy use superlu
-                sp.sparse.linalg.use_solver(useUmfpackbool=True)
-                # compute the lu factor                
-                lusolve=sp.sparse.linalg.factorized(Bord)
-                                                
-            # Forward and back substitution, u contains [dx, dlda]) 
-            u = lusolve(F)
-            print("              # solve LU real time :", time.time()-tic) 
-            
-            # get lda^(n)
-            derivee=u[-1]                             
-            # store the value                        
-            self.dlda.append( derivee  )                   
-            self.dx.append(  u.copy()[:-1]   ) 
-            print(n, ' ')
-
-        print('\n')
+        if self._mixed:
+            # single precision superlu, with iterative refinement
+            return self._mixedSolver(Bord, splu)
+        if self._trans:
+            # umfpack solves have no trans argument
+            return splu(Bord)
+        # umfpack is not in scipy but need to be installed with scikit-umfpack
+        # if not present, scipy use superlu
+        sp.sparse.linalg.use_solver(useUmfpackbool=True)
+        # compute the lu factor                
+        return sp.sparse.linalg.factorized(Bord)
+
+    def _solveBordered(self, Ftemp):
+        """ Solve the bordered system with the RHS Ftemp.
+        """
+        Zerv = np.zeros(shape=(1,), dtype=complex) 
+        F= np.concatenate((Ftemp, Zerv))
+        # Forward and back substitution, u contains [dx, dlda]) 
+        u = self._factor[2](F)
+        # get lda^(n)
+        return u[-1], u[:-1]
+
+    def _solveBorderedT(self, F=None, c=0.):
+        """ Solve the transposed bordered system with the RHS [F, c].
+
+        The bordered matrix is then factorized with SuperLU, see `getLeftDerivatives`.
+        """
+        if F is None:
+            F = np.zeros(self.x.shape, dtype=complex)
+        u = self._factor[2](np.concatenate((F, [c])), trans='T')
+        return u[:-1]
             
 # end class ScipyspEig
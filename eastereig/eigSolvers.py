@@ -77,13 +77,15 @@ class EigSolver(ABC):
         self.K=K
     
     
-    def extract(self, eig_list):
+    def extract(self, eig_list, **kwargs):
         """ Extract the eig_list eigenvectors and return a type of Eig object ?
     
         Parameters
         ----------
         eig_list : iterable
             index list (related to the sort criteria) of the wanted eigenvalue
+        kwargs : dict
+            optional arguments passed to `Eig`, e.g. `storage`
             
         Returns
         -------
@@ -93,7 +95,7 @@ class EigSolver(ABC):
         extracted = []
         # loop over the modes
         for i in eig_list:
-            extracted.append( Eig(self._lib,self.Lda[i], self.Vec[:,i]) )
+            extracted.append( Eig(self._lib,self.Lda[i], self.Vec[:,i], **kwargs) )
                     
         return extracted 
 
@@ -158,7 +160,7 @@ class NumpyEigSolver(EigSolver):
     """
     # keep trace of the lib
     _lib='numpy'              
-    def solve(self,nev=6,target=0+0j,skipsym=False):
+    def solve(self,nev=6,target=0+0j,skipsym=False,v0=None):
         """ Solve the eigenvalue problem and get back the results as (Lda, X)
 
         Parameters
@@ -169,13 +171,16 @@ class NumpyEigSolver(EigSolver):
             target used for the shift and invert transform
         skipsym : bool
             remove eigenvalue with imag lda< 0
+        v0 : array, optional
+            starting vector of the iterative solvers
 
         Remarks
         --------
-        For full matrix, all eigenvalues are obtained. Neither 'nev' nor 'target' are used. These parameters
+        For full matrix, all eigenvalues are obtained. Neither 'nev', 'target' nor 'v0' are used. These parameters
         are used to ensure a common interface between solvers.
         """   
-        print('> Solve {} eigenvalue problem with {} class...\n'.format(self.pb_type,self.__class__.__name__))
+        if not gopts['silent']:
+            print('> Solve {} eigenvalue problem with {} class...\n'.format(self.pb_type,self.__class__.__name__))
         if self.pb_type=='std':            
             self.Lda,Vec = sp.linalg.eig(self.K[0],b=None) 
         elif self.pb_type=='gen':            
@@ -250,7 +255,7 @@ class ScipySpEigSolver(EigSolver):
     # keep trace of the lib
     _lib = 'scipysp'
     
-    def solve(self, nev=6, target=0+0j, skipsym=False):
+    def solve(self, nev=6, target=0+0j, skipsym=False, v0=None):
         """ Solve the eigenvalue problem and get back the results as (Lda, X)
         
         Parameters
@@ -261,18 +266,24 @@ class ScipySpEigSolver(EigSolver):
             target used for the shift and invert transform
         skipsym : bool
             remove eigenvalue with imag lda< 0
+        v0 : array, optional
+            starting vector of ARPACK, e.g. a previous eigenvector
 
         Remarks
         --------
         For full matrix all eigenvalues are obtained. nev is not used.
         """
-        print('> Solve eigenvalue {} problem with {} class...\n'.format(self.pb_type,self.__class__.__name__))
+        if not gopts['silent']:
+            print('> Solve eigenvalue {} problem with {} class...\n'.format(self.pb_type,self.__class__.__name__))
         if self.pb_type == 'std':
-            self.Lda, Vec = eigs(self.K[0], k=nev, M=None, sigma=target, return_eigenvectors=True)
+            self.Lda, Vec = eigs(self.K[0], k=nev, M=None, sigma=target, v0=v0, return_eigenvectors=True)
         elif self.pb_type == 'gen':
-            self.Lda, Vec = eigs(self.K[0], k=nev, M=-self.K[1], sigma=target, return_eigenvectors=True)
+            self.Lda, Vec = eigs(self.K[0], k=nev, M=-self.K[1], sigma=target, v0=v0, return_eigenvectors=True)
         elif self.pb_type == 'PEP':
-            self.Lda, Vec = self._pep(self.K, k=nev, sigma=target)
+            if v0 is not None:
+                # eigenvector of the linearized problem [x, lda x]
+                v0 = np.concatenate([v0, target*v0])
+            self.Lda, Vec = self._pep(self.K, k=nev, sigma=target, v0=v0)
         else:
             raise NotImplementedError('The pb_type {} is not yet implemented'.format(self.pb_type))
 
@@ -283,7 +294,7 @@ class ScipySpEigSolver(EigSolver):
         return self.Lda
 
     @staticmethod
-    def _pep(K, k=4, sigma=0.):
+    def _pep(K, k=4, sigma=0., v0=None):
         """ Polynomial eigenvalue solver by linearisation with scipy sparse.
 
         1st basic version limited to quadratic eigenvalue problem.        
@@ -296,6 +307,8 @@ class ScipySpEigSolver(EigSolver):
             The number of requested eigenpairs.
         sigma : complex
             The value arround which eigenvalues are looked for.
+        v0 : array, optional
+            The starting vector of ARPACK, of size 2n.
 
         Examples
         ---------
@@ -327,7 +340,7 @@ class ScipySpEigSolver(EigSolver):
                             [Z, K[2]]
                             ], dtype=dtype).tocsc()
         # solved linearised QEP
-        D, V = eigs(A, k=k, M=B, sigma=sigma, return_eigenvectors=True)
+        D, V = eigs(A, k=k, M=B, sigma=sigma, v0=v0, return_eigenvectors=True)
         # the (2*N,) eigenvector are normalized to 1.
         V = V[0:shape[0], :]
         return D, V
@@ -430,13 +443,15 @@ if _petscHere:
             """ Destroy the petsc/slecp solver"""
             self.E.destroy()
     
-        def extract(self, eig_list):
+        def extract(self, eig_list, **kwargs):
             """ Extract the eig_list eigenvectors
         
             Parameters
             ----------
             eig_list : iterable
                 index list (related to the sort criteria) of the wanted eigenvalue
+            kwargs : dict
+                optional arguments passed to `Eig`
                 
             Returns
             -------
@@ -450,7 +465,7 @@ if _petscHere:
             # loop over the modes
             for i in eig_list:            
                 lda =self.E.getEigenpair(self.idx[i],vr) 
-                extracted.append( Eig(self._lib,lda, vr.copy()) )
+                extracted.append( Eig(self._lib,lda, vr.copy(), **kwargs) )
                         
             return extracted
             
@@ -76,7 +76,13 @@ $$
 # from .utils import multinomial_index_coefficients
 from scipy.special import binom, factorial
 from scipy.optimize import linear_sum_assignment
+import scipy.linalg as spl
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
 import numpy as np
+from .stats import Stats
+from .utils import taylorShift, aberth
+from .series import TaylorSeries
 
 # matplotib not mandarotry for computing
 try:
@@ -86,6 +92,19 @@ except:
 
 
 
+def _fDerivatives(flda, lda, k):
+    """ Get the derivatives of order 0 to k of the function of the eigenvalue
+    `flda` (see `lda_func`) with respect to lda.
+
+    The `flda` interface gives the derivatives of f(lda(nu)) with respect to nu,
+    with lda(nu) = lda + nu they are the derivatives with respect to lda.
+    """
+    if flda is None:
+        return np.array([1.] + [0.]*k)
+    dlda = [lda, 1.] + [0.]*k
+    return np.array([flda(j, k+1, dlda) for j in range(k+1)])
+
+
 class EP:
     """
     Class to locate EP and get Puiseux expansion
@@ -109,12 +128,15 @@ class EP:
     Th_roots: np.array
         the roots of T_h of order N, obtained after `locate`
     dg: np.array
-        the derivatives of g function
+        the derivatives of g function, memoized and extended when the
+        derivatives of the eigenvalues grow
     dh: np.array
-        the derivatives of the h function
+        the derivatives of the h function, memoized as `dg`
     aposterioriErr: np.array
         the error between N and N-1 roots. Significant only fort the first terms,
         higher order terms may be in wrong order. Obtained after `locate`
+    stats: Stats
+        the profiling of the computations, see the `stats` module
 
     """
 
@@ -129,6 +151,13 @@ class EP:
         self.nu0 = vp1.nu0
         self._vp1dlda = vp1.dlda
         self._vp2dlda = vp2.dlda
+        # number of memoized orders of g and h, see `_update`
+        self._auxN = 0
+        self._delta = self._dgTay = self._dhTay = np.zeros(0, dtype=complex)
+        # roots of T_h for each degree, used as initial values, see `getRoots`
+        self._warmRoots = {}
+        # profiling, see the `stats` module
+        self.stats = Stats(self.__class__.__name__)
 
     def __repr__(self):
         """ Define the object representation
@@ -144,48 +173,121 @@ class EP:
         return text.format(len(EP_loc), self._vp1dlda[0], self._vp2dlda[0],
                            self.nu0, Err, EP_loc)
 
+    @classmethod
+    def fromStreams(cls, vp1, vp2, op, Nmax=30, tol=1e-2, xi=0.95, nstable=3, Nmin=4):
+        """ Compute the derivatives of vp1 and vp2 order by order and locate the EP
+        after each new order.
+
+        The derivatives are computed with `Eig.iterDerivatives`. After each order,
+        `dh`, the roots of T_h and the a posteriori error are updated with `locate`.
+        The computation stops when an EP is found (N vs N-1 error below `tol`) for
+        `nstable` successive orders, or when `Nmax` is reached. The derivatives
+        can be extended later with `getDerivatives`.
+
+        Parameters
+        ----------
+        vp1, vp2: Eig
+            the two eigenvalues that may merge
+        op: OP
+            the operator OP instance that describe the eigenvalue problem
+        Nmax: int
+            the maximal number of derivatives
+        tol, xi: float
+            the parameters of `locate`
+        nstable: int
+            the number of successive orders with an EP required to stop
+        Nmin: int
+            the number of derivatives computed before the first `locate`
+
+        Returns
+        -------
+        ep: EP
+            the EP instance. `N` is the number of derivatives used, `converged`
+            indicates if the stopping criterion is met and `history` contains the
+            smallest a posteriori error obtained for each N (inf if no EP is found)
+
+        Examples
+        --------
+        >>> from eastereig.examples.ThreeDoF import ThreeDof
+        >>> model = ThreeDof([1., 2., 3, 1., 1., 1.], 1., 5)
+        >>> model.createSolver(pb_type='gen')
+        >>> _ = model.solver.solve()
+        > Solve gen eigenvalue problem with NumpyEigSolver class...
+        <BLANKLINE>
+        >>> ev1, ev2 = model.solver.extract([1, 2])
+        >>> ep = EP.fromStreams(ev1, ev2, model, Nmax=12, tol=1e-4)
+        > Linear solve...
+        > Linear solve...
+        >>> ep.converged, ep.N < 12, len(ev1.dlda) == ep.N + 1
+        (True, True, True)
+        >>> min(abs(np.array(ep.EP_loc) - (0.8926160798+0.5977042029j))) < 1e-4
+        True
+
+        The derivatives already computed are reused, even if they are not
+        available at the same order for both eigenvalues
+        >>> from eastereig import gopts
+        >>> gopts['silent'] = True
+        >>> ev3, ev4 = model.solver.extract([1, 2])
+        >>> ev3.getDerivatives(5, model)
+        >>> ep = EP.fromStreams(ev3, ev4, model, Nmax=12, tol=1e-4)
+        >>> gopts['silent'] = False
+        >>> ep.converged, len(ev3.dlda) == len(ev4.dlda) == ep.N + 1
+        (True, True)
+        """
+        # the Eigs may already hold a different number of derivatives, extend
+        # the shorter one to start both streams at the same order
+        n = max(len(vp.dx) for vp in (vp1, vp2)) - 1
+        for vp in (vp1, vp2):
+            if len(vp.dx) - 1 < n or len(vp.dlda) != len(vp.dx):
+                vp.getDerivatives(n, op)
+        stream1 = vp1.iterDerivatives(Nmax, op)
+        stream2 = vp2.iterDerivatives(Nmax, op)
+        ep = None
+        history = []
+        stable = 0
+        for _ in zip(stream1, stream2):
+            if ep is None:
+                # nu0 is known once the derivatives computation is started
+                ep = cls(vp1, vp2)
+            if len(vp1.dlda) - 1 < Nmin:
+                continue
+            err = ep.aposterioriErr if ep.locate(tol=tol, xi=xi) else []
+            history.append(min(err) if err else np.inf)
+            stable = stable + 1 if err else 0
+            if stable >= nstable:
+                break
+        # stop both derivatives computations
+        stream1.close()
+        stream2.close()
+        if ep is None:
+            ep = cls(vp1, vp2)
+        ep.N = len(vp1.dlda) - 1
+        ep.converged = stable >= nstable
+        ep.history = history
+        return ep
+
     @staticmethod
     def dlda2dh(dlda1, dlda2):
         """ compute the n-th firts derivative of h = (lda_1-lda2)**2 from dlda1 and dlda2
 
         arxiv.org/abs/1909.11579 Eq. 7b
-        use standard liebnitz rule and a compact version for symmetric terms
+        The Taylor coefficients of h are the Cauchy product of the Taylor coefficients
+        of lda_1-lda2 with itself, computed with one convolution. It is equivalent
+        to Liebnitz rule and avoids the cancellation between the squares and the cross terms.
 
         Examples
         ---------
-        >>> EP.dlda2dh([1,0.5,0.13,0.01],[3,0.1,0.05,0.015])
+        >>> EP.dlda2dh([1,0.5,0.13,0.01],[3,0.1,0.05,0.015]).round(12)
         array([ 4.   +0.j, -1.6  +0.j,  0.   +0.j,  0.212+0.j])
         """
         if len(dlda1) != len(dlda2):
             raise IndexError("Derivative sequences must have the same size")
 
         N = len(dlda1)
-        # init derivatives of each terms
-        dh1 = np.zeros(N, dtype=np.complex)
-        dh2 = np.zeros(N, dtype=np.complex)
-        dh12 = np.zeros(N, dtype=np.complex)
-        # init 1st terms (no derivation)
-        dh1[0] = dlda1[0]**2
-        dh2[0] = dlda2[0]**2
-        dh12[0] = dlda1[0]*dlda2[0]
-        # loop for the N-st derivatives
-        for n in range(1, N):
-            # symetric terms
-            stop = int(np.floor(n/2.))
-            for j in range(0, stop+1):
-                # delta is equal to one only when $$n$$ is even
-                delta = (n/2.) == j
-                b = binom(n, j)
-                dh1[n] = dh1[n] + b*(2 - delta)*dlda1[n-j]*dlda1[j]
-                dh2[n] = dh2[n] + b*(2 - delta)*dlda2[n-j]*dlda2[j]
-
-            # cross terms
-            for j in range(0, n+1):
-                b = binom(n, j)
-                dh12[n] = dh12[n] + b*dlda1[j]*dlda2[n-j]
-        # assemble all local out
-        dh = dh1 + dh2 - 2*dh12
-        return dh
+        fact = factorial(np.arange(N))
+        # Taylor coefficients of lda_1 - lda_2, h is its square (Cauchy product)
+        d = (np.asarray(dlda1, dtype=complex) - np.asarray(dlda2, dtype=complex)) / fact
+        return np.convolve(d, d)[:N] * fact
 
     @staticmethod
     def Pmatrix(z0, N):
@@ -213,10 +315,8 @@ class EP:
                [ 0.  +0.j ,  0.  +0.j ,  1.  +0.j ]])
 
         """
-        P = np.zeros((N, N), dtype=np.complex)
-        for i in range(N):
-            for j in range(i, N):
-                P[i, j] = binom(j, i)*(-z0)**(j-i)
+        i, j = np.meshgrid(np.arange(N), np.arange(N), indexing='ij')
+        P = np.where(j >= i, binom(j, i)*(-z0 + 0j)**np.maximum(j - i, 0), 0)
         return P
 
     @staticmethod
@@ -276,7 +376,7 @@ class EP:
                -1.45112934-3.49571785j])
         """
 
-        r = EP.Pmatrix(xi, len(c)) @ c
+        r = taylorShift(c, xi)
 
         # check requested number of coefficients
         if N > len(r):
@@ -295,36 +395,163 @@ class EP:
         ao[0] = np.sqrt(complex(r[1])/4.)
         alpha = 1./(8*ao[0])
 
-        # n >= 2
+        # n >= 2, S = 4 sum_{i=1}^{n-1} ao[i] ao[n-i]
         for n in range(1, Nmax):
-            S = 0
-            if n > 1:
-                idx = range(1, n)
-                S = 4.*sum([ao[idx[i]]*ao[idx[-1-i]] for i in range(n-1)])
-                # for i in range(n-1):
-                #     print('n=',n,idx[i],idx[-1-i] )
+            S = 4.*(ao[1:n] @ ao[n-1:0:-1])
             ao[n] = (r[n+1] - S)*alpha
 
         return ao
 
+    def _update(self):
+        """ Extend the derivatives and the Taylor coefficients of g and h with
+        the new derivatives of lda1 and lda2.
+
+        The values are memoized. Only the new orders are computed, in O(N) per
+        order. They are recomputed from scratch only if the derivative sequences
+        have been truncated or modified (e.g. new nu0).
+
+        Examples
+        --------
+        >>> from types import SimpleNamespace
+        >>> vp1 = SimpleNamespace(nu0=0., dlda=[1, 0.5, 0.13])
+        >>> vp2 = SimpleNamespace(nu0=0., dlda=[3, 0.1, 0.05])
+        >>> ep = EP(vp1, vp2)
+        >>> ep._update()
+        >>> vp1.dlda.append(0.01); vp2.dlda.append(0.015)
+        >>> ep._update()
+        >>> ep._auxN, np.allclose(ep.dh, EP.dlda2dh(vp1.dlda, vp2.dlda))
+        (4, True)
+
+        A modified intermediate derivative is detected
+        >>> vp1.dlda[2] = 0.2
+        >>> ep._update()
+        >>> np.allclose(ep.dh, EP.dlda2dh(vp1.dlda, vp2.dlda))
+        True
+        """
+        d1, d2 = self._vp1dlda, self._vp2dlda
+        N = len(d1)
+        if N != len(d2):
+            raise IndexError("Derivative sequences must have the same size")
+        n = self._auxN
+        # check that the known derivatives are unchanged
+        if n > 0 and (N < n or not all(np.array_equal(old[:n], np.array(d[:n], dtype=complex))
+                                       for old, d in zip(self._auxD, (d1, d2)))):
+            n = 0
+        if n == N:
+            return
+        fact = factorial(np.arange(N))
+        # Taylor coefficients of lda1 - lda2 and of g
+        delta = np.zeros(N, dtype=complex)
+        gTay = np.zeros(N, dtype=complex)
+        hTay = np.zeros(N, dtype=complex)
+        delta[:n], gTay[:n], hTay[:n] = self._delta[:n], self._dgTay[:n], self._dhTay[:n]
+        new1 = np.array(d1[n:N], dtype=complex)
+        new2 = np.array(d2[n:N], dtype=complex)
+        delta[n:] = (new1 - new2) / fact[n:]
+        gTay[n:] = (new1 + new2) / fact[n:]
+        # h = (lda1 - lda2)**2, Cauchy product of delta with itself
+        if n == 0:
+            hTay = np.convolve(delta, delta)[:N]
+        else:
+            for k in range(n, N):
+                hTay[k] = delta[:k+1] @ delta[k::-1]
+        self._delta, self._dgTay, self._dhTay = delta, gTay, hTay
+        self.dg = gTay * fact
+        self.dh = hTay * fact
+        self._auxN = N
+        # copies of the derivatives used to compute dg and dh
+        self._auxD = (np.array(d1[:N], dtype=complex), np.array(d2[:N], dtype=complex))
+
     def _dh(self):
         """
         Compute T_h using truncated Taylor of lda1 and lda2
         """
-        dh = EP.dlda2dh(self._vp1dlda, self._vp2dlda)
-        # store
-        self.dh = dh
-        # store also Taylor coeff
-        self._dhTay = dh/factorial(np.arange(len(self.dh)))
+        self._update()
 
     def _dg(self):
         """
         Compute T_g using truncated Taylor of lda1 and lda2
         """
-        # compute the derivatives g**(n)
-        self.dg = np.array(self._vp1dlda) + np.array(self._vp2dlda)
-        # store also Taylor coeff
-        self._dgTay = self.dg/factorial(np.arange(len(self.dg)))
+        self._update()
+
+    def getRoots(self, ntronc=1):
+        """
+        Compute the roots of \( T_h^{N} \), \( T_h^{N-1} \), ..., \( T_h^{N-ntronc} \).
+
+        The roots of each order are obtained with the Aberth-Ehrlich iterations
+        (see `utils.aberth`), starting from the roots of the previous order
+        completed by one new root. The sum of the roots is known from the
+        coefficients (Vieta's formula), it gives the initial value of the
+        new root. The roots are kept for the next calls, thus when the derivatives
+        grow (e.g. with `fromStreams`) only a refinement is needed. The companion
+        matrix (`np.roots`) is used for the first order and if the iterations
+        fail.
+
+        Parameters
+        ----------
+        ntronc : int
+            the number of lower truncation orders
+
+        Returns
+        -------
+        roots : list
+            `roots[k]` contains the roots of \( T_h^{N-k} \) shifted by nu0
+            and sorted in ascending order of modulus
+
+        Examples
+        --------
+        >>> from types import SimpleNamespace
+        >>> vp1 = SimpleNamespace(nu0=1., dlda=[1, 0.5, 0.13, 0.01, -0.02, 0.03])
+        >>> vp2 = SimpleNamespace(nu0=1., dlda=[3, 0.1, 0.05, 0.015, 0.01, -0.01])
+        >>> ep = EP(vp1, vp2)
+        >>> roots = ep.getRoots(ntronc=2)
+        >>> [len(r) for r in roots]
+        [5, 4, 3]
+        >>> ref = [np.roots(ep._dhTay[-(1+k)::-1]) + 1. for k in range(3)]
+        >>> max(np.abs(r[:, None] - r_[None, :]).min(axis=1).max() for r, r_ in zip(roots, ref)) < 1e-10
+        True
+        """
+        N = len(self._vp1dlda) - 1
+        with self.stats.timer('dh', N):
+            self._update()
+        c = self._dhTay
+        with self.stats.timer('roots', N):
+            warm = self._warmRoots
+            # the highest stored degree that is not above the lowest requested order
+            d0 = max([d for d in warm if d <= N - ntronc], default=None)
+            if d0 is None:
+                d0 = N - ntronc
+                warm[d0] = self._companionRoots(c[:d0+1])
+                start = d0 + 1
+            else:
+                # the stored roots may come from other derivatives values
+                start = d0
+            for d in range(start, N + 1):
+                init = None
+                if c[d] != 0:
+                    if len(warm.get(d, ())) == d:
+                        init = warm[d]
+                    elif len(warm.get(d - 1, ())) == d - 1:
+                        init = np.append(warm[d-1], -c[d-1]/c[d] - warm[d-1].sum())
+                converged = False
+                if init is not None:
+                    z, converged = aberth(c[:d+1], init)
+                if not converged:
+                    self.stats.count('roots_companion', order=N)
+                    z = self._companionRoots(c[:d+1])
+                warm[d] = z
+        roots = []
+        for d in range(N, N - ntronc - 1, -1):
+            r = warm[d]
+            roots.append(r[np.argsort(np.abs(r))] + self.nu0)
+        return roots
+
+    @staticmethod
+    def _companionRoots(c):
+        """ Compute the roots of the polynomial with ascending coefficients c,
+        with `np.roots`.
+        """
+        return np.roots(c[::-1])
 
     def _roots(self, tronc):
         """
@@ -339,15 +566,9 @@ class EP:
         roots : array_like
             the roots of Th shifted by nu0
         """
-        # compute h derivative and Taylor
-        self._dh()
-        # get roots  Th_N
-        roots = np.roots(self._dhTay[-(1+tronc)::-1])
-        ind = np.argsort(np.abs(roots))
-        roots = roots[ind] + self.nu0
-        return roots
+        return self.getRoots(ntronc=tronc)[tronc]
 
-    def locate(self, tol=1e-2, xi=0.95, tronc=0):
+    def locate(self, tol=1e-2, xi=0.95, tronc=0, nconv=1):
         """
         Compute the roots \( \\zeta_n \) of \( T_h^{N} \) the taylor expansion of h of order N.
         The Exceptional Point (EP) is/are one of these roots.
@@ -357,43 +578,47 @@ class EP:
 
         The algorithm to identified the EP is:
 
-          1. Compare the roots with \( T_h^{N-1} \)
+          1. Compare the roots with \( T_h^{N-1} \), ..., \( T_h^{N-nconv} \)
           2. Check if they belong to the mean radius circle \( \\vert \zeta_n \\vert < \\xi R \)
 
+        The roots of all the truncation orders are obtained together with `getRoots`.
+
         Parameters
         -----------
         tol: float
             the tolerance value between N and N-1 roots. Default value 1e-2
         a: float
             coef to make more stringent the condition on the mean radius R. Default value 0.95
+        nconv: int
+            the number of lower truncation orders used to check the convergence
+            of the roots, the error is the largest distance. Default value 1
 
         Returns
         --------
         EP_loc: list
             the list of exceptional points
         """
-        # roots of ThN
-        roots = self._roots(tronc=0)
-        # roots of Th_{N-1}
-        roots1 = self._roots(tronc=1)
+        # roots of ThN, Th_{N-1}, ...
+        all_roots = self.getRoots(ntronc=nconv)
+        roots = all_roots[0]
         # routh estimate of Th radius of convergence upper bound
         ThRadius = np.abs(roots-self.nu0).mean()
 
-        # locate EP
-        # Err = np.ones(roots1.shape)
-
         # use munkres algorithm to find the correspondance between root and roots1
         # simple sort is not sufficent if roots are complex conjugate (ie same modulus)
         closest = np.abs(roots-self.nu0) < xi*ThRadius
-        # compute the distance matrix D between all combination
-        R1, R2 = np.meshgrid(roots[closest], roots1[closest[:-1]])
-        D = np.abs(R1-R2)
-        row_ind, col_ind = linear_sum_assignment(D)
-        Err = D[row_ind, col_ind]
+        Err = np.zeros(closest.sum())
+        with self.stats.timer('match', len(self._vp1dlda) - 1):
+            for k, rootsk in enumerate(all_roots[1:], 1):
+                # compute the distance matrix D between all combination
+                D = np.abs(roots[closest][:, None] - rootsk[closest[:-k]][None, :])
+                row_ind, col_ind = linear_sum_assignment(D)
+                Errk = np.full(len(Err), np.inf)
+                Errk[row_ind] = D[row_ind, col_ind]
+                Err = np.maximum(Err, Errk)
 
         EPlist = np.where(Err < tol)[0]
         self.aposterioriErr = Err[EPlist].tolist()
-#                print('> EP Error vs N and N-1 = %f\n' % (abs(EP_locN1-EP_loc)/abs(EP_loc)))
         self.EP_loc = roots[EPlist].tolist()
         self.Th_roots = roots
 
@@ -429,28 +654,20 @@ class EP:
         except:
             EP_loc = self.locate()[index]
 
-        # compute derivatives of g (sum)
-        self._dg()
-
-        # sure dh exist
-        try:
-            self.dh
-        except:
-            self._dh()
+        # derivatives of g (sum) and h, memoized
+        self._update()
 
         # number of derivatives
         N = len(self.dg)
 
         # Even coefficients of the puiseux series
         # Pmat0 = np.eye( N, dtype=np.complex)
-        PmatDeltaParam0_EP = EP.Pmatrix((self.nu0-EP_loc), N)
-        dgTayCoef = self.dg / factorial(np.arange(N))
-        # if Pmat0 = eye, no need inversion
-        # ae0 =  np.dot( Pmat0 ,(np.dot(PmatDeltaParam0_EP,dgTayCoef)))/2.
-        ae0 = (PmatDeltaParam0_EP @ dgTayCoef)/2.
+        with self.stats.timer('puiseux', N - 1):
+            # Taylor shift, equivalent to P(nu0 - EP_loc) @ dgTay
+            ae0 = taylorShift(self._dgTay, self.nu0 - EP_loc)/2.
 
-        # odd coefficients of the puiseux series
-        ao = EP.solveOddPower((self.nu0-EP_loc), self._dhTay, N)
+            # odd coefficients of the puiseux series
+            ao = EP.solveOddPower((self.nu0-EP_loc), self._dhTay, N)
 
         # concatenation of the 2 coefs. famillies
         self.a = [None]*len(self.EP_loc)
@@ -460,6 +677,140 @@ class EP:
         return self.a
 
 
+    def refine(self, opFactory, index=0, maxit=3, tol=1e-12):
+        r""" Refine the EP location with Newton iterations on the full operator.
+
+        The EP \((\nu^*, \lambda^*)\) is a solution of the augmented system
+        $$
+        \begin{align}
+        \mathbf{L}(\nu, \lambda) \mathbf{x} &= 0, \\
+        \mathbf{L}(\nu, \lambda) \mathbf{y} + \partial_\lambda \mathbf{L}(\nu, \lambda) \mathbf{x} &= 0, \\
+        \mathbf{v}^T \mathbf{x} = 1, \quad \mathbf{v}^T \mathbf{y} &= 0,
+        \end{align}
+        $$
+        where \(\mathbf{y}\) is the generalized eigenvector of the Jordan chain.
+        The Jacobian is non singular at a generic EP, thus the convergence is
+        quadratic. Each iteration needs the operator at the new \(\nu\) and one
+        sparse factorization of the Jacobian.
+
+        The initial guess is `EP_loc[index]` and \(\lambda^* \simeq T_g(\nu^*)/2\).
+        Near the EP, the two eigenvectors \(\mathbf{x}_\pm \simeq \mathbf{x} \pm
+        \delta \mathbf{y}\) differ by \(O(\sqrt{\nu - \nu^*})\). They are obtained
+        by inverse subspace iteration and a projected quadratic eigenvalue problem,
+        then their mean and their difference give \(\mathbf{x}\) and
+        \(\mathbf{y}\) with an \(O(\nu - \nu^*)\) error, in the basin of the
+        quadratic convergence.
+
+        Parameters
+        ----------
+        opFactory : callable
+            opFactory(nu) returns the OP instance at nu0=nu (numpy or scipysp)
+        index : int
+            the index of the selected EP
+        maxit : int
+            the maximal number of Newton iterations
+        tol : float
+            the relative tolerance on the correction of nu
+
+        Returns
+        -------
+        nu, lda : complex
+            the refined EP and the associated eigenvalue. The Newton corrections
+            of nu are stored in `refine_history`, `EP_loc` is not modified.
+
+        Examples
+        --------
+        >>> from eastereig.examples.ThreeDoF import ThreeDof
+        >>> from eastereig import gopts
+        >>> k0 = [1., 2., 3, 1., 1., 1.+0j]
+        >>> model = ThreeDof(k0, 1., 5)
+        >>> model.createSolver(pb_type='gen')
+        >>> _ = model.solver.solve()
+        > Solve gen eigenvalue problem with NumpyEigSolver class...
+        <BLANKLINE>
+        >>> ev1, ev2 = model.solver.extract([1, 2])
+        >>> gopts['silent'] = True
+        >>> _ = model.getDerivatives([ev1, ev2], 6)
+        >>> gopts['silent'] = False
+        >>> ep = EP(ev1, ev2)
+        >>> ind = np.argmin(abs(np.array(ep.locate(tol=0.1)) - (0.89+0.6j)))
+        >>> abs(ep.EP_loc[ind] - (0.89261605363+0.59770424455j)) > 1e-5
+        True
+        >>> nu, lda = ep.refine(lambda nu: ThreeDof(k0, nu, 5), index=ind)
+        >>> abs(nu - (0.89261605363+0.59770424455j)) < 1e-10, ep.refine_history[-1] < 1e-12
+        (True, True)
+        >>> len(ep.refine_history), nu != ep.EP_loc[ind]
+        (3, True)
+
+        The two eigenvalues coalesce at the refined EP
+        >>> from scipy.linalg import eigvals
+        >>> op = ThreeDof(k0, nu, 5)
+        >>> lda12 = np.sort_complex(eigvals(op.K[0], -op.K[1]))[1:]
+        >>> abs(lda12 - lda).max() < 1e-6
+        True
+        """
+        def assemble(op, nu, lda):
+            """ Get L, its derivatives % lda and % nu, and the ones of L_lda.
+            """
+            if op._lib not in ('numpy', 'scipysp'):
+                raise NotImplementedError('The EP refinement is only available with numpy and scipysp')
+            mats = [sps.csc_matrix(op.K[0].shape, dtype=complex) for _ in range(5)]
+            for i, f in enumerate(op.flda):
+                Ki = sps.csc_matrix(op.K[i])
+                dKi = op.getdK(i, 1)
+                dKi = None if dKi is int(0) else sps.csc_matrix(dKi)
+                df = _fDerivatives(f, lda, 2)
+                # L, L_lda, L_lda_lda
+                for k in range(3):
+                    if df[k] != 0:
+                        mats[k] = mats[k] + df[k]*Ki
+                # L_nu, L_lda_nu
+                if dKi is not None:
+                    for k in range(2):
+                        if df[k] != 0:
+                            mats[3+k] = mats[3+k] + df[k]*dKi
+            return mats
+
+        self._update()
+        nu = self.EP_loc[index]
+        lda = np.polynomial.polynomial.polyval(nu - self.nu0, self._dgTay)/2.
+        L, Ll, Lll, Ln, Lln = assemble(opFactory(nu), nu, lda)
+        n = L.shape[0]
+        # the two eigenvectors close to the EP by inverse subspace iteration
+        lu = spla.splu(L.tocsc())
+        X = np.random.default_rng(0).standard_normal((n, 2)) + 0j
+        for _ in range(2):
+            X = np.linalg.qr(lu.solve(X))[0]
+        # projected problem (A0 + mu A1 + mu**2 A2) z = 0, with mu = lda - lda_guess
+        A0, A1, A2 = (X.conj().T @ (M @ X) for M in (L, Ll, Lll/2.))
+        I, O = np.eye(2), np.zeros((2, 2))
+        mu, Z = spl.eig(np.block([[O, I], [-A0, -A1]]), np.block([[I, O], [O, A2]]))
+        k = np.argsort(abs(mu))[:2]
+        x1, x2 = X @ Z[:2, k[0]], X @ Z[:2, k[1]]
+        # x = (x1 + x2)/2 and y = (x1 - x2)/(mu1 - mu2) with v^T x = 1, v^T y = 0
+        v = x1.conj() / (x1.conj() @ x1)
+        x2 = x2/(v @ x2)
+        x, y = (x1 + x2)/2., (x1 - x2)/(mu[k[0]] - mu[k[1]])
+        lda = lda + mu[k].mean()
+        col = lambda u: sps.csc_matrix(u[:, None])
+        self.refine_history = []
+        for it in range(maxit):
+            if it > 0:
+                L, Ll, Lll, Ln, Lln = assemble(opFactory(nu), nu, lda)
+            F = np.concatenate([L @ x, L @ y + Ll @ x, [v @ x - 1., v @ y]])
+            J = sps.bmat([[L, None, col(Ll @ x), col(Ln @ x)],
+                          [Ll, L, col(Ll @ y + Lll @ x), col(Ln @ y + Lln @ x)],
+                          [sps.csc_matrix(v[None, :]), None, None, None],
+                          [None, sps.csc_matrix(v[None, :]), None, None]], format='csc')
+            with self.stats.timer('refine', it):
+                delta = spla.spsolve(J, -F)
+            x, y = x + delta[:n], y + delta[n:2*n]
+            lda, nu = lda + delta[2*n], nu + delta[2*n+1]
+            self.refine_history.append(abs(delta[2*n+1]))
+            if abs(delta[2*n+1]) <= tol*max(abs(nu), 1.):
+                break
+        return nu, lda
+
     def plotZeros(self, index=0, Title='empty', Couleur='k',
                   variable='\\nu', fig=-1):
         """
@@ -547,3 +898,281 @@ class EP:
 
         # plt.savefig('roots.pdf', format='pdf', dpi=300)
         plt.show()
+
+
+class EPScan:
+    r"""
+    Screen all the pairs of a list of eigenvalues to find the EPs.
+
+    For M eigenvalues computed at the same `nu0`, the M(M-1)/2 Taylor series of
+    the h functions are computed in one vectorized pass and the roots of
+    \( T_h^{N} \) and \( T_h^{N-1} \) of all the pairs are obtained together
+    with the eigenvalues of the stacked companion matrices.
+
+    As in `EP.locate`, an EP is a root of \( T_h^{N} \) inside the circle
+    \( \vert \zeta_n \vert < \xi R \) that is also a root of \( T_h^{N-1} \).
+    The roots of the two orders are matched one to one (munkres algorithm) and
+    the distance to the matched root is used as a posteriori error. The found pairs can be studied further with an `EP`
+    instance, see `getEP`. With `locateDiscriminant`, all the coalescences of
+    the cluster are obtained from the roots of a single polynomial.
+
+    Attributes
+    -----------
+    eigs: list
+        the list of Eig objects
+    nu0: complex
+        the common computation point
+    pairs: array
+        the (P, 2) index of the pairs of eigenvalues
+    Th_roots: array
+        the (P, N-1) roots of T_h of order N of each pair, sorted by modulus,
+        obtained after `locate`
+    EP_list: list
+        the found EP ranked by a posteriori error, obtained after `locate`.
+        Each EP is a tuple `(err, nu, (i, j))`, where i and j are the index of
+        the eigenvalues in `eigs`
+    Disc_roots: array
+        the roots of the Taylor series of the discriminant, obtained after
+        `locateDiscriminant`
+
+    Examples
+    --------
+    >>> from eastereig.examples.ThreeDoF import ThreeDof
+    >>> model = ThreeDof([1., 2., 3, 1., 1., 1.], 1., 5)
+    >>> model.createSolver(pb_type='gen')
+    >>> _ = model.solver.solve()
+    > Solve gen eigenvalue problem with NumpyEigSolver class...
+    <BLANKLINE>
+    >>> evs = model.solver.extract([0, 1, 2])
+    >>> from eastereig import gopts
+    >>> gopts['silent'] = True
+    >>> _ = model.getDerivatives(evs, 12)
+    >>> gopts['silent'] = False
+    >>> scan = EPScan(evs)
+    >>> nu_ep = 0.8926160536+0.5977042446j
+    >>> err, nu, pair = min(scan.locate(), key=lambda e: abs(e[1] - nu_ep))
+    >>> pair, abs(nu - nu_ep) < 1e-6
+    ((1, 2), True)
+    >>> ep = scan.getEP(*pair)
+    >>> min(abs(np.array(ep.locate()) - nu)) < 1e-8
+    True
+    """
+
+    def __init__(self, eigs):
+        """ Init method
+        """
+        self.eigs = list(eigs)
+        self.nu0 = self.eigs[0].nu0
+        if any(vp.nu0 != self.nu0 for vp in self.eigs):
+            raise ValueError('Eigenvalues are not computed at the same point')
+        self.pairs = np.array(np.triu_indices(len(self.eigs), 1)).T
+        # profiling, see the `stats` module
+        self.stats = Stats(self.__class__.__name__)
+
+    def __repr__(self):
+        """ Define the object representation
+        """
+        text = "Instance of EPScan class\n#{} eigenvalues, #{} pairs\n  > nu0 : {}"
+        return text.format(len(self.eigs), len(self.pairs), self.nu0)
+
+    def _hTay(self):
+        """ Compute the Taylor coefficients of h for all the pairs.
+
+        Returns
+        --------
+        hTay: array
+            the (P, N) Taylor coefficients, N is the smallest number of
+            derivatives of the eigenvalues
+        """
+        N = min(len(vp.dlda) for vp in self.eigs)
+        D = np.array([vp.dlda[:N] for vp in self.eigs], dtype=complex) / factorial(np.arange(N))
+        delta = D[self.pairs[:, 0]] - D[self.pairs[:, 1]]
+        hTay = np.empty_like(delta)
+        # Cauchy product, vectorized over the pairs
+        for k in range(N):
+            hTay[:, k] = np.einsum('pj,pj->p', delta[:, :k+1], delta[:, k::-1])
+        return hTay
+
+    @staticmethod
+    def batchRoots(c):
+        """ Compute the roots of several polynomials with the same degree with
+        stacked companion matrices.
+
+        Parameters
+        ----------
+        c: array
+            the (P, d+1) polynomial coefficients in ascending order
+
+        Returns
+        --------
+        roots: array
+            the (P, d) roots, sorted by modulus. If the leading coefficient
+            vanishes, the roots are nan.
+
+        Examples
+        --------
+        >>> EPScan.batchRoots(np.array([[2., -3., 1.], [-6., 1., 1.]])).real.round(12)
+        array([[ 1.,  2.],
+               [ 2., -3.]])
+        """
+        P, d = c.shape[0], c.shape[1] - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            monic = c[:, :d] / c[:, d:]
+        C = np.zeros((P, d, d), dtype=complex)
+        C[:, np.arange(1, d), np.arange(d-1)] = 1.
+        C[:, :, -1] = -monic
+        bad = ~np.isfinite(monic).all(axis=1)
+        C[bad] = 0.
+        roots = np.linalg.eigvals(C)
+        roots[bad] = np.nan
+        ind = np.argsort(np.abs(roots), axis=1)
+        return np.take_along_axis(roots, ind, axis=1)
+
+    @staticmethod
+    def matchRoots(roots, roots1, closest):
+        """ Match the roots of two successive orders with the munkres algorithm,
+        as in `EP.locate`.
+
+        Parameters
+        ----------
+        roots: array
+            the d roots of order N, sorted by modulus
+        roots1: array
+            the d-1 roots of order N-1, sorted by modulus
+        closest: array
+            the boolean mask of the selected roots of order N
+
+        Returns
+        --------
+        Err: array
+            the distance of each root to its matched root of order N-1, inf
+            for the unselected or unmatched roots
+
+        Examples
+        --------
+        The two roots close to 1 cannot be matched with the same root
+        >>> EPScan.matchRoots(np.array([1., 1.01, 3.]), np.array([1., 3.]), np.ones(3, bool))
+        array([ 0., inf,  0.])
+        """
+        Err = np.full(len(roots), np.inf)
+        if not np.isfinite(roots1).all():
+            return Err
+        ind = np.nonzero(closest)[0]
+        # the roots of order N-1 are selected as in `EP.locate`
+        D = np.abs(roots[ind][:, None] - roots1[closest[:-1]][None, :])
+        row_ind, col_ind = linear_sum_assignment(D)
+        Err[ind[row_ind]] = D[row_ind, col_ind]
+        return Err
+
+    def locate(self, tol=1e-2, xi=0.95):
+        """
+        Locate the EPs of all the pairs of eigenvalues.
+
+        Parameters
+        -----------
+        tol: float
+            the tolerance value between N and N-1 roots. Default value 1e-2
+        xi: float
+            coef to make more stringent the condition on the mean radius R. Default value 0.95
+
+        Returns
+        --------
+        EP_list: list
+            the list of `(err, nu, (i, j))` ranked by a posteriori error
+        """
+        N = min(len(vp.dlda) for vp in self.eigs) - 1
+        with self.stats.timer('dh', N):
+            hTay = self._hTay()
+        with self.stats.timer('roots', N):
+            roots = self.batchRoots(hTay)
+            roots1 = self.batchRoots(hTay[:, :-1])
+        with self.stats.timer('match', N):
+            # roots inside the circle of each pair
+            radius = np.abs(roots).mean(axis=1, keepdims=True)
+            closest = np.abs(roots) < xi*radius
+            # distance to the matched root of T_h^{N-1}
+            Err = np.array([self.matchRoots(*args) for args in zip(roots, roots1, closest)])
+            Err = Err.reshape(roots.shape)  # also without pair
+            p, r = np.nonzero(Err < tol)
+        self.Th_roots = roots + self.nu0
+        EP_list = [(Err[pi, ri], roots[pi, ri] + self.nu0, tuple(self.pairs[pi].tolist()))
+                   for pi, ri in zip(p, r)]
+        self.EP_list = sorted(EP_list, key=lambda e: e[0])
+        return self.EP_list
+
+    def locateDiscriminant(self, tol=1e-2, xi=0.95):
+        r"""
+        Locate the EPs of the cluster with the discriminant of all the eigenvalues.
+
+        The discriminant \( \prod_{i<j} (\lambda_i - \lambda_j)^2 \) vanishes
+        when any two eigenvalues of the cluster coalesce, including at higher
+        order EPs. Its Taylor series is the product of the series of the h
+        functions (see `series.TaylorSeries`), thus one polynomial root-finding
+        gives all the EPs. The roots are selected as in `locate`. Then the
+        merging pair is the pair with the smallest \( \vert T_h \vert \) at
+        the EP, relatively to its value at `nu0`.
+
+        Parameters
+        -----------
+        tol: float
+            the tolerance value between N and N-1 roots. Default value 1e-2
+        xi: float
+            coef to make more stringent the condition on the mean radius R. Default value 0.95
+
+        Returns
+        --------
+        EP_list: list
+            the list of `(err, nu, (i, j))` ranked by a posteriori error
+
+        Examples
+        --------
+        >>> from eastereig.examples.ThreeDoF import ThreeDof
+        >>> from eastereig import gopts
+        >>> model = ThreeDof([1., 2., 3, 1., 1., 1.], 1., 5)
+        >>> model.createSolver(pb_type='gen')
+        >>> _ = model.solver.solve()
+        > Solve gen eigenvalue problem with NumpyEigSolver class...
+        <BLANKLINE>
+        >>> evs = model.solver.extract([0, 1, 2])
+        >>> gopts['silent'] = True
+        >>> _ = model.getDerivatives(evs, 12)
+        >>> gopts['silent'] = False
+        >>> scan = EPScan(evs)
+        >>> nu_ep = 0.8926160536+0.5977042446j
+        >>> err, nu, pair = min(scan.locateDiscriminant(), key=lambda e: abs(e[1] - nu_ep))
+        >>> pair, abs(nu - nu_ep) < 1e-8
+        ((1, 2), True)
+
+        At least two eigenvalues are required
+        >>> EPScan(evs[:1]).locateDiscriminant()
+        Traceback (most recent call last):
+        ...
+        ValueError: The discriminant requires at least two eigenvalues
+        """
+        if len(self.eigs) < 2:
+            raise ValueError('The discriminant requires at least two eigenvalues')
+        N = min(len(vp.dlda) for vp in self.eigs) - 1
+        with self.stats.timer('dh', N):
+            hTay = self._hTay()
+            D = TaylorSeries(hTay[0])
+            for c in hTay[1:]:
+                D = D * TaylorSeries(c)
+        with self.stats.timer('roots', N):
+            roots = self.batchRoots(D.c[None, :])[0]
+            roots1 = self.batchRoots(D.c[None, :-1])[0]
+        with self.stats.timer('match', N):
+            closest = np.abs(roots) < xi*np.abs(roots).mean()
+            Err = self.matchRoots(roots, roots1, closest)
+            found = np.nonzero(Err < tol)[0]
+            # |T_h| of all the pairs at the found roots
+            Th = np.abs(np.polynomial.polynomial.polyval(roots[found], hTay.T))
+            merging = np.argmin(Th / np.abs(hTay[:, :1]), axis=0)
+        self.Disc_roots = roots + self.nu0
+        EP_list = [(Err[r], roots[r] + self.nu0, tuple(self.pairs[p].tolist()))
+                   for r, p in zip(found, merging)]
+        return sorted(EP_list, key=lambda e: e[0])
+
+    def getEP(self, i, j):
+        """ Get the EP instance associated to the pair (i, j).
+        """
+        return EP(self.eigs[i], self.eigs[j])
@@ -67,6 +67,16 @@ Check eigenvalues
 >>> abs(ev0.lda - (1.78568026+0.j))<1e-6
 True
 
+The derivatives computed concurrently (workers=3) match the serial ones
+>>> ee.gopts['silent'] = True
+>>> ref_model = ThreeDof(k_0, k6_0, k6_idx)
+>>> ref_model.createSolver(pb_type='gen')
+>>> _ = ref_model.solver.solve()
+>>> refs = ref_model.getDerivatives(ref_model.solver.extract([0, 1, 2]), 12, workers=1)
+>>> ee.gopts['silent'] = False
+>>> all(np.allclose(ev.dlda, ref.dlda, rtol=1e-12) for ev, ref in zip(evs, refs))
+True
+
 Get exceptional points location and check values
 >>> EP1,EP2 = EPs
 >>> EP1.locate()
@@ -97,6 +107,49 @@ True
 >>> abs(aaf2 - lda_[2])/abs(lda_[2]) < 1e-3
 True
 
+All the truncation orders are obtained in one pass
+>>> table, err = ev2.convergenceTable(check_pt, kind='pade', n=N)
+>>> table.shape, abs(table[-1] - pad2) < 1e-12
+((6,), True)
+>>> abs(table[-1] - lda_[2]) < err < 1e-2*abs(lda_[2])
+True
+
+With the left eigenvector, the eigenvalue derivatives up to order 2n+1 are
+obtained from the eigenvector derivatives up to order n
+>>> ev_ref, ev_2s, ev_sym = model.solver.extract([2, 2, 2])
+>>> ev_ref.getDerivatives(11, model)
+> Linear solve...
+>>> ev_2s.getDerivativesTwoSided(11, model)
+> Linear solve...
+>>> len(ev_2s.dx), len(ev_2s.dy), len(ev_2s.dlda)
+(6, 6, 12)
+>>> np.allclose(ev_2s.dlda, ev_ref.dlda, rtol=1e-10)
+True
+
+The number of solves is only halved for symmetric operators, like this one.
+Otherwise, the left solves cost as much as the saved right solves
+>>> ev_sym.getDerivativesTwoSided(11, model, symmetric=True)
+> Linear solve...
+>>> np.allclose(ev_sym.dlda, ev_ref.dlda, rtol=1e-10)
+True
+>>> [ev.stats.summary()['solve']['count'] for ev in (ev_ref, ev_2s, ev_sym)]
+[11, 5, 5]
+>>> ev_2s.stats.summary()['solve_left']['count'], 'solve_left' in ev_sym.stats.summary()
+(6, False)
+
+The bordered matrix can be factorized in single precision, the double precision
+is recovered with iterative refinement
+>>> ev_mp, = model.solver.extract([2])
+>>> ev_mp.getDerivatives(11, model, mixed_precision=True)
+> Linear solve...
+>>> max(ev_mp.refine_err.values()) < 1e-14, np.allclose(ev_mp.dlda, ev_ref.dlda, rtol=1e-10)
+(True, True)
+
+The time spent in each phase is recorded for each derivative order
+>>> order11 = ev_mp.stats.byOrder()[11]
+>>> ev_mp.stats.summary()['solve']['count'], order11['matvec'], order11['getRHS'] > 0
+(11, 2, True)
+
 """
 
 # standard
@@ -274,11 +327,9 @@ def myMain(k6_0, k6_idx,k_0,Nderiv=12):
     # Instanciate Eig objects (by depacking extracted_eV in ev0,ev1,ev2)
     ev0, ev1, ev2 = extracted_eV
 
-    # Then compute the eigenvalues derivatives
+    # Then compute the eigenvalues derivatives, concurrently
     # N.B. : Eigenderivatives have to be computed before trying to locate EPs
-    ev0.getDerivatives(Nderiv,toyModel)
-    ev1.getDerivatives(Nderiv,toyModel)
-    ev2.getDerivatives(Nderiv,toyModel)
+    toyModel.getDerivatives(extracted_eV, Nderiv, workers=3)
 
 
     print('> Locate EPs :')
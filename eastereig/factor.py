@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define a manager to reuse the symbolic factorization of the bordered matrices
+
+The bordered matrix `[[L, L1x], [v.T, 0]]` has the same sparsity pattern for all
+the eigenpairs and for all the values of `nu0` of a given discretization. With
+petsc, the `FactorManager` keeps, for each pattern, a pool of KSPs and of their
+factored matrices. Each `Eig` takes a KSP from the pool for its own use, and
+gives it back with `releaseFactor`, which is called at the end of
+`getDerivatives` unless `keep_factor` is True. The values of the new matrix are
+copied in the matrix of a reused KSP, thus the direct solver only does the
+numerical factorization.
+
+The module instance `factor_manager` is used by `PetscEig` when the option
+'factor_reuse' is True (False by default). There is no equivalent with scipy:
+SuperLU and UMFPACK do not expose their symbolic factorization, and reusing
+only the column ordering of SuperLU does not save time.
+
+`MixedPrecisionSolver` factorizes the bordered matrix in complex64 and recovers
+the complex128 accuracy with iterative refinement.
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+
+
+class FactorManager:
+    """ Least recently used cache of the pools of released petsc KSPs, one
+    pool per sparsity pattern.
+
+    The manager is thread-safe and can be shared between several eigenpairs
+    and several `OP` instances.
+
+    Attributes
+    ----------
+    max_patterns: int
+        the maximal number of stored patterns
+    hits: int
+        the number of KSPs taken from a pool
+    misses: int
+        the number of new KSPs, with a full symbolic analysis
+    """
+
+    def __init__(self, max_patterns=4):
+        """ Init the manager with its maximal number of patterns
+        """
+        self.max_patterns = max_patterns
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return "Instance of {} with #{} patterns, hits={}, misses={}".format(
+            self.__class__.__name__, len(self._data), self.hits, self.misses)
+
+    def __len__(self):
+        return len(self._data)
+
+    def _put(self, key, value):
+        """ Store the data associated to `key` and remove the oldest patterns.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_patterns:
+                _, old = self._data.popitem(last=False)
+                self._destroy(old)
+
+    @staticmethod
+    def _destroy(value):
+        """ Destroy the petsc objects of a pool of KSPs.
+        """
+        for slot in value:
+            slot['ksp'].destroy()
+            slot['B'].destroy()
+
+    def clear(self):
+        """ Remove all the patterns, the counters are kept.
+        """
+        with self._lock:
+            for old in self._data.values():
+                self._destroy(old)
+            self._data.clear()
+
+    def petscFactor(self, B, init):
+        """ Get a KSP for the petsc matrix B, from the pool of the KSPs with the
+        same pattern if possible.
+
+        The KSP is owned by the caller until `petscRelease`, thus several
+        eigenpairs never share the same factorization. When a KSP is reused,
+        the values of B are copied in its matrix and the direct solver only does
+        the numerical factorization at the next solve.
+
+        Parameters
+        ----------
+        B : petsc Mat
+            the matrix to factorize
+        init : callable
+            init(A) returns a new KSP for the matrix A
+
+        Returns
+        -------
+        slot : dict
+            contains the 'ksp', its matrix 'B' and the pattern 'key'
+        """
+        from petsc4py import PETSc
+        ia, ja = B.getRowIJ()
+        digest = hashlib.sha1(np.ascontiguousarray(ia).tobytes())
+        digest.update(np.ascontiguousarray(ja).tobytes())
+        # the key must be the same on all the processes
+        comm = B.getComm().tompi4py()
+        key = (B.getSize(), tuple(comm.allgather(digest.hexdigest())))
+        slot = self._take(key)
+        if slot is None:
+            A = B.duplicate(copy=True)
+            return {'ksp': init(A), 'B': A, 'key': key}
+        B.copy(slot['B'], structure=PETSc.Mat.Structure.SAME_NONZERO_PATTERN)
+        slot['ksp'].setOperators(slot['B'])
+        return slot
+
+    def _take(self, key):
+        """ Remove a slot from the pool of the pattern `key` and return it, or
+        None if the pool is empty.
+        """
+        with self._lock:
+            pool = self._data.get(key)
+            if pool:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return pool.pop()
+            self.misses += 1
+            return None
+
+    def petscRelease(self, slot):
+        """ Give back a KSP obtained with `petscFactor` to the pool of its pattern.
+
+        Examples
+        --------
+        The pool does not depend on petsc, the slots are only moved
+        >>> manager = FactorManager()
+        >>> slot = {'ksp': None, 'B': None, 'key': ('shape', 'digest')}
+        >>> manager._take(slot['key']) is None
+        True
+        >>> manager.petscRelease(slot)
+        >>> manager._take(slot['key']) is slot, manager._take(slot['key']) is None
+        (True, True)
+        >>> manager
+        Instance of FactorManager with #1 patterns, hits=1, misses=2
+        """
+        with self._lock:
+            pool = self._data.get(slot['key'])
+            if pool is None:
+                self._put(slot['key'], [slot])
+            else:
+                pool.append(slot)
+
+
+def splu(A):
+    """ LU factorization of a scipy sparse matrix with SuperLU.
+
+    Returns
+    -------
+    solve : callable
+        the function that solves A x = b, or A^T x = b with `trans='T'`
+    """
+    return spla.splu(sps.csc_matrix(A)).solve
+
+
+class MixedPrecisionSolver:
+    """ Solve A x = b with a single precision LU factorization and iterative
+    refinement against the double precision matrix.
+
+    The residual is computed in double precision and the correction is solved
+    with the single precision factors, until the normwise backward error
+    ||b - A x|| / (||A|| ||x|| + ||b||) (infinity norm) is below `tol`. For the
+    transposed solves, ||A^T|| is the 1-norm of A.
+
+    Attributes
+    ----------
+    err: float
+        the backward error of the last solve
+    it: int
+        the number of refinement steps of the last solve
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import scipy.sparse as sps
+    >>> A = sps.random(50, 50, density=0.1, format='csc', random_state=1) + 10*sps.eye(50)
+    >>> solver = MixedPrecisionSolver(A, splu)
+    >>> x = solver(np.ones(50))
+    >>> solver.err < 1e-14, x.dtype
+    (True, dtype('complex128'))
+    >>> xt = solver(np.ones(50), trans='T')
+    >>> solver.err < 1e-14, np.allclose(A.T @ xt, 1.)
+    (True, True)
+    """
+
+    def __init__(self, A, factorize, tol=1e-14, maxit=10):
+        """ Factorize `A` in single precision with `factorize`, that returns the
+        function solve(b, trans='N').
+        """
+        self.A = A
+        self.tol = tol
+        self.maxit = maxit
+        # infinity norms of A and of A^T
+        self.normA = {'N': np.abs(A).sum(axis=1).max(), 'T': np.abs(A).sum(axis=0).max()}
+        self._solve = factorize(A.astype(np.complex64))
+        self.err = None
+        self.it = 0
+
+    def _lowSolve(self, v, trans):
+        """ Solve in single precision, the RHS is scaled to avoid underflow.
+        """
+        scale = np.abs(v).max()
+        if scale == 0:
+            return np.zeros_like(v)
+        y = self._solve((v/scale).astype(np.complex64), trans=trans)
+        return y.astype(complex)*scale
+
+    def __call__(self, b, trans='N'):
+        """ Solve A x = b, or A^T x = b with `trans='T'`.
+        """
+        b = np.asarray(b, dtype=complex)
+        A = self.A if trans == 'N' else self.A.T
+        normA = self.normA['N' if trans == 'N' else 'T']
+        normb = np.abs(b).max()
+        x = self._lowSolve(b, trans)
+        for it in range(self.maxit + 1):
+            r = b - A @ x
+            den = normA*np.abs(x).max() + normb
+            err = np.abs(r).max()/den if den > 0 else 0.
+            if err <= self.tol or it == self.maxit:
+                break
+            x += self._lowSolve(r, trans)
+        self.err, self.it = err, it
+        return x
+
+
+# the manager shared by all the Eig instances
+factor_manager = FactorManager()
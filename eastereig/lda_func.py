@@ -27,12 +27,56 @@ define a dict to get the derivative % lda of the function of lda
 
 Remarks:
 --------
-1. Only linear and quadratic dependancy are now implemented
-2. If function are added, don't forget do update `_dlda_flda`
+1. Linear and quadratic dependancy are implemented as functions, general
+analytic dependancy with the `Analytic` class (e.g. `LdaExp`, `LdaSqrt`) based on
+the truncated Taylor series of `eastereig.series`
+2. If function are added, don't forget do update `_dlda_flda`, or use `dfdlda` to
+get the derivative with respect to lda
 
+Examples
+--------
+Nonlinear eigenvalue problem [diag(nu, 2 + nu) - exp(lda) I] x = 0, the eigenvalue
+lda = log(nu) has the derivatives (-1)**(n-1) (n-1)!/nu**n
+>>> import numpy as np
+>>> import eastereig as ee
+>>> class Delay(ee.OP):
+...     def __init__(self, nu0):
+...         self._lib = 'numpy'
+...         self.setnu0(nu0)
+...         self.K = [np.diag([nu0, 2. + nu0]).astype(complex), -np.eye(2, dtype=complex)]
+...         self.dK = [lambda n: self.K[0] if n == 0 else (np.eye(2) if n == 1 else 0),
+...                    lambda n: self.K[1] if n == 0 else 0]
+...         self.flda = [None, LdaExp(1.)]
+>>> vp = ee.eig.NumpyEig('numpy', np.log(2.), np.array([1., 0.], dtype=complex))
+>>> ee.gopts['silent'] = True
+>>> vp.getDerivatives(5, Delay(2.))
+>>> ee.gopts['silent'] = False
+>>> np.allclose(vp.dlda[1:], [0.5, -0.25, 0.25, -0.375, 0.75])
+True
+
+With a non-normal operator [[nu, 1], [nu, 3]] - exp(lda) I, compare with the
+finite differences of lda = log(mu), where mu is the largest eigenvalue of the matrix
+>>> class Delay2(Delay):
+...     def __init__(self, nu0):
+...         super().__init__(nu0)
+...         self.K[0] = np.array([[nu0, 1.], [nu0, 3.]], dtype=complex)
+...         self.dK[0] = lambda n: self.K[0] if n == 0 else (np.array([[1., 0.], [1., 0.]]) if n == 1 else 0)
+>>> mu = lambda nu: ((nu + 3) + np.sqrt((nu + 3)**2 - 8*nu)) / 2
+>>> vp = ee.eig.NumpyEig('numpy', np.log(mu(2.)), np.array([1., 2.], dtype=complex))
+>>> ee.gopts['silent'] = True
+>>> vp.getDerivatives(3, Delay2(2.))
+>>> ee.gopts['silent'] = False
+>>> h = 1e-3
+>>> fd1 = (np.log(mu(2. + h)) - np.log(mu(2. - h))) / (2*h)
+>>> fd2 = (np.log(mu(2. + h)) - 2*np.log(mu(2.)) + np.log(mu(2. - h))) / h**2
+>>> np.allclose(vp.dlda[1:3], [fd1, fd2], rtol=1e-5)
+True
 """
 import scipy as sp
+import scipy.special
+import threading
 import numpy as np
+from eastereig.series import TaylorSeries
 
 # linear dependancy in lda
 def Lda(k,n,dlda): 
@@ -92,31 +136,22 @@ def Lda2(k,n,dlda):
     >>> abs(Lda2(4,5,dlda) - valid[4]) < 1e-12
     True
     """
-    binom = sp.special.binom
-    start=0
-        
     # k=0 nothing to du just return dlda[0]**2
     if k==0:
-        d= dlda[0]**2
-    # else compute ;-)
-    else:        
-        if k == n: start=1
-        # init sum
-        d=0
-        # upper bound
-        stop = int(np.floor(k/2.))
-        for j in range(start,stop+1):
-            #delta is equal to one only when $n$ is even
-            delta = (k/2.) == j
-            d = d +  binom(k,j)*(2 - delta)*dlda[k-j]*dlda[j]
-            
-    return d 
-    
-   
-    
-    
-    
-    
+        return dlda[0]**2
+    # else compute ;-), vectorized over j
+    start = 1 if k == n else 0
+    # upper bound
+    stop = int(np.floor(k/2.))
+    j = np.arange(start, stop+1)
+    if len(j) == 0:
+        return 0
+    d = np.asarray(dlda[:k+1])
+    # the weight is 1 (instead of 2) only for the middle term, when k is even
+    w = sp.special.binom(k, j)*(2. - (2*j == k))
+    return w @ (d[k-j]*d[j])
+
+
 def dLda2(lda):
     """ Compute the 1st derivative of the function Lda2 with respect to lda
     """
@@ -124,10 +159,154 @@ def dLda2(lda):
     
           
 
-#def faaDiBruno():
-#    """
-#    #TODO ! to add more general dependancies...
-#    """
+class Analytic:
+    """ General analytic function of the eigenvalue f(lda(nu)).
+
+    The function is defined by its action on a `TaylorSeries`. The derivatives of
+    f(lda(nu)) are obtained by the composition of f with the Taylor series of
+    lda(nu), instead of Faa di Bruno formula. At order n, all the derivatives
+    f^(k), k <= n, are computed at once and cached; the term containing lda^(n)
+    is skipped by setting lda^(n) = 0 (it is f'(lda) lda^(n)).
+
+    The derivative with respect to lda is available with the `dlda` method,
+    thus these functions don't need to be enrolled in `_dlda_flda`.
+
+    Parameters
+    -----------
+    fun : callable
+        fun(s) returns the TaylorSeries of f(s), e.g. `lambda s: (-tau*s).exp()`
+    name : string, optional
+        the name of the function
+
+    Examples
+    ---------
+    Compare with `Lda2`, with the derivatives of y(x) = log(x) + 2 for x=2
+    >>> dlda  = np.array([2.69314718055995, 1.5, -0.25, 0.25, -0.375, 0.75])
+    >>> square = Analytic(lambda s: s**2, 'square')
+    >>> all(abs(square(k, 5, dlda) - Lda2(k, 5, dlda)) < 1e-12 for k in range(6))
+    True
+    >>> square.dlda(3.)
+    (6+0j)
+    """
+
+    def __init__(self, fun, name='Analytic'):
+        self.fun = fun
+        self.name = name
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return "{}({})".format(self.__class__.__name__, self.name)
+
+    def dlda(self, lda):
+        """ Compute the 1st derivative of f with respect to lda.
+        """
+        return self.fun(TaylorSeries([lda, 1.])).c[1]
+
+    def derivatives(self, n, dlda):
+        """ Compute the derivatives of order 0 to n of f(lda(nu)), the term
+        containing lda^(n) being skipped.
+
+        The result depends only on dlda[0], ..., dlda[n-1]. It is cached for
+        each dlda sequence, thus the RHS coefficients are computed once per order.
+        The cache is thread-safe and the cached value is used only if the known
+        derivatives are unchanged.
+
+        Parameters
+        -----------
+        n : int
+            the final requested number of derivative of lda
+        dlda : iterable
+            the value of the eigenvalue derivative
+
+        Returns
+        --------
+        d : array
+            the n+1 derivatives
+        """
+        # at order 0, nothing is skipped and f(lda) is returned
+        n_ = max(min(n, len(dlda)), 1)
+        known = np.array(dlda[:n_], dtype=complex)
+        key = id(dlda)
+        with self._lock:
+            cached = self._cache.get(key)
+        # the whole sequence is checked, it may be modified or its id reused
+        if cached is not None and cached[0] == n and np.array_equal(cached[1], known):
+            return cached[2]
+        d = np.zeros(n+1, dtype=complex)
+        d[:n_] = known
+        d = self.fun(TaylorSeries.fromDerivatives(d)).derivatives()
+        with self._lock:
+            if len(self._cache) > 64:
+                self._cache.clear()
+            self._cache[key] = (n, known, d)
+        return d
+
+    def __call__(self, k, n, dlda):
+        """
+        Compute the k-th derivative of f(lda(nu)) with respect to nu
+
+        **If k==n, the terms containing lda^(n) are skiped**. They dont belong to the RHS computation
+
+        Parameters
+        -----------
+        k : int
+            the requested derivative order of the flda term
+        n : int
+            the final requested number of derivative of lda
+        dlda : iterable
+            the value of the eigenvalue derivative
+        """
+        return self.derivatives(n, dlda)[k]
+
+
+def LdaExp(a):
+    """ Exponential of the eigenvalue exp(a*lda), e.g. for delay models with
+    a = -tau.
+
+    Examples
+    ---------
+    Compute the derivatives of exp(-2 lda(nu)) with lda(nu) = nu + nu**2/2 at nu=0
+    >>> f = LdaExp(-2.)
+    >>> dlda = [0., 1., 1., 0., 0.]
+    >>> np.allclose([f(k, 5, dlda) for k in range(5)], [1., -2., 2., 4., -20.])
+    True
+    """
+    return Analytic(lambda s: (a*s).exp(), 'exp({}*lda)'.format(a))
+
+
+def LdaSqrt():
+    """ Square root of the eigenvalue sqrt(lda), with the principal branch,
+    e.g. for radiation conditions.
+
+    Examples
+    ---------
+    >>> f = LdaSqrt()
+    >>> f(0, 2, [4., 1.]), f(1, 2, [4., 1.]), f.dlda(4.)
+    ((2+0j), (0.25+0j), (0.25+0j))
+    """
+    return Analytic(lambda s: s.sqrt(), 'sqrt(lda)')
+
+
+def dfdlda(flda):
+    """ Get the function that computes the derivative of flda with respect to lda.
+
+    Parameters
+    -----------
+    flda : callable or None
+        a function of `lda_func`
+
+    Returns
+    --------
+    dflda : callable
+        the function of lda
+    """
+    try:
+        return _dlda_flda[flda]
+    except KeyError:
+        return flda.dlda
 
 
 # mapping between f(lda) -> d_\dlda f(lda)
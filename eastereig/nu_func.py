@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define the scalar functions of nu for operators with an affine parameter dependence
+
+Many operators can be written as
+$$ \\mathbf{K}_i(\\nu) = \\sum_j f_{ij}(\\nu) \\mathbf{A}_{ij}, $$
+where the matrices \\(\\mathbf{A}_{ij}\\) are fixed. With `OP.setAffine`, the
+derivatives of the scalar functions are computed by the library and each fixed
+matrix is applied only once per derivative order in `OP.getRHS`, no `dK`
+function is needed.
+
+  - These functions have the same interface : my_fun(n, nu) returns the n-th
+  derivative of the function with respect to nu, evaluated at nu.
+  - The classes below can be scaled by a constant, e.g. `2j*Exp(0.5)`.
+
+Examples
+--------
+Compare the affine description of the impedance waveguide with the `dK` functions
+>>> import numpy as np
+>>> from eastereig.examples.WGimpedance_scipysp import Zscipysp
+>>> z0, k0 = 486.198103097114 + 397.605679264872j, 2*np.pi*200/340.
+>>> ref = Zscipysp(z=z0, n=20, h=1., rho=1.2, c=340., k=k0)
+>>> aff = Zscipysp(z=z0, n=20, h=1., rho=1.2, c=340., k=k0)
+>>> omega = aff.k*aff.c
+>>> aff.setAffine([[(aff.k**2*aff._Mmat - aff._Kmat, None),
+...                 (aff._GamMat, 1j*aff.rho*omega*Inv)],
+...                [(-aff._Mmat, None)]], aff.flda)
+>>> ref.createSolver(pb_type='gen')
+>>> _ = ref.solver.solve(nev=3, target=0+0j, skipsym=False)
+> Solve eigenvalue gen problem with ScipySpEigSolver class...
+<BLANKLINE>
+>>> ev_ref, ev_aff = ref.solver.extract([0, 0])
+>>> from eastereig import gopts
+>>> gopts['silent'] = True
+>>> ev_ref.getDerivatives(6, ref)
+>>> ev_aff.getDerivatives(6, aff)
+>>> gopts['silent'] = False
+>>> np.allclose(ev_aff.dlda, ev_ref.dlda, rtol=1e-10)
+True
+>>> ev_aff.stats.counters['dK_eval'], ev_aff.stats.counters['matvec'] < ev_ref.stats.counters['matvec']
+(0, True)
+"""
+
+import numpy as np
+from scipy.special import factorial
+
+
+class NuFunc:
+    """ Base class of the scalar functions of nu, scaled by `coef`.
+
+    The subclasses define `_d(n, nu)`, the n-th derivative of the unscaled
+    function.
+    """
+
+    def __init__(self):
+        self.coef = 1.
+
+    def __call__(self, n, nu):
+        """ Get the n-th derivative with respect to nu, evaluated at nu.
+        """
+        return self.coef * self._d(n, nu)
+
+    def derivatives(self, N, nu):
+        """ Get the derivatives of order 0 to N at nu.
+
+        Returns
+        -------
+        d : array
+            the N+1 derivatives
+        """
+        return np.array([self(n, nu) for n in range(N+1)], dtype=complex)
+
+    def __mul__(self, c):
+        new = object.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new.coef = self.coef * c
+        return new
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return "{}*{}".format(self.coef, self.__class__.__name__)
+
+
+class Poly(NuFunc):
+    """ Polynomial c[0] + c[1] nu + c[2] nu**2 + ...
+
+    Examples
+    --------
+    >>> p = Poly([1., 0., 3.])
+    >>> p(0, 2.), p(1, 2.), p(2, 2.), p(3, 2.)
+    (13.0, 12.0, 6.0, 0.0)
+    """
+
+    def __init__(self, c):
+        super().__init__()
+        self.c = np.asarray(c)
+
+    def _d(self, n, nu):
+        if n >= len(self.c):
+            return 0.
+        return np.polynomial.polynomial.polyval(nu, np.polynomial.polynomial.polyder(self.c, n))
+
+    def taylor(self, N, nu):
+        """ Get the N+1 first Taylor coefficients at nu, ie f^(n)(nu)/n!.
+        """
+        return np.array([self._d(n, nu) for n in range(N+1)]) / factorial(np.arange(N+1))
+
+
+class Power(NuFunc):
+    """ Power function nu**p, p can be any real number.
+
+    Examples
+    --------
+    >>> Power(-1)(3, 2.) == -6/2.**4
+    True
+    """
+
+    def __init__(self, p):
+        super().__init__()
+        self.p = p
+
+    def _d(self, n, nu):
+        # p (p-1) ... (p-n+1)
+        a = np.prod(self.p - np.arange(n))
+        if a == 0:
+            return 0.
+        return a * nu**(self.p - n)
+
+
+Inv = Power(-1)
+""" The inverse function 1/nu """
+
+
+class Exp(NuFunc):
+    """ Exponential function exp(a nu).
+
+    Examples
+    --------
+    >>> f = 2*Exp(0.5)
+    >>> abs(f(2, 1.) - 2*0.25*np.exp(0.5)) < 1e-14
+    True
+    """
+
+    def __init__(self, a=1.):
+        super().__init__()
+        self.a = a
+
+    def _d(self, n, nu):
+        return self.a**n * np.exp(self.a*nu)
+
+
+class Rational(NuFunc):
+    """ Rational function num(nu)/den(nu), where num and den are the polynomial
+    coefficients in ascending order.
+
+    The Taylor coefficients are obtained by series division.
+
+    Examples
+    --------
+    >>> r = Rational([1.], [0., 1.])
+    >>> r(3, 2.) == Inv(3, 2.)
+    True
+    """
+
+    def __init__(self, num, den):
+        super().__init__()
+        self.num = Poly(num)
+        self.den = Poly(den)
+        self._cache = (None, np.zeros(0))
+
+    def _d(self, n, nu):
+        nu_c, q = self._cache
+        if nu_c != nu or len(q) <= n:
+            a = self.num.taylor(n, nu)
+            b = self.den.taylor(n, nu)
+            q = np.zeros(n+1, dtype=np.result_type(a, b))
+            for k in range(n+1):
+                q[k] = (a[k] - b[1:k+1] @ q[k-1::-1][:k]) / b[0]
+            self._cache = (nu, q)
+        return q[n] * factorial(n)
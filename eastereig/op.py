@@ -42,14 +42,19 @@ to the splitting between `K`, `dK` and `flda` and the `getRHS` method during its
 call by `Eig` class objects.
 """
 # std lib
-from scipy.special import binom
+from scipy.special import binom, factorial
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from functools import partial
 import numpy as np
 # ee
 from . import eigSolvers
 from .adapter import adaptVec, adaptMat  # adapter patern to avoid interface missmatch
 from . import lda_func
 from .utils import multinomial_index_coefficients
-from eastereig import  _CONST, _petscHere
+from .cache import MatrixCache
+from .stats import Stats
+from eastereig import  _CONST, _petscHere, gopts
 from abc import ABC, abstractmethod
 
 
@@ -64,6 +69,28 @@ else:
                   'scipysp':eigSolvers.ScipySpEigSolver}
 
 
+# lock to create the shared objects of the operators and to store the RHS plans
+_PLAN_LOCK = threading.Lock()
+
+
+def _combine(dx, index, coef, lib):
+    """ Compute the linear combination sum_i coef[i]*dx[index[i]] of eigenvector derivatives.
+
+    If `dx` is stored in a contiguous array (see `storage.ArrayStore`), the
+    combination is a single matrix-vector product.
+    """
+    if hasattr(dx, 'combine'):
+        return dx.combine(index, coef)
+    y = None
+    for i, c in zip(index, coef):
+        yi = adaptVec(dx[i], lib).dot(c)
+        if y is None:
+            y = yi
+        else:
+            y += yi
+    return y
+
+
 # Abstract class, not instanciable
 #TODO add a check function before solver
 class OP(ABC):
@@ -82,6 +109,10 @@ class OP(ABC):
     fdla: list
         A list of function that give the dependancy % lda
 
+    The evaluated derivatives of the matrices are stored in `dKcache`, shared by
+    all the eigenpairs computed with the same instance. The matrices are only
+    identified by `(Kid, n)`: `setnu0` and `setAffine` clear the cache, any other
+    modification of `K` or `dK` must be followed by `dKcache.clear()`.
     """
 
     SOLVER_DICT = _SOLVER_DICT
@@ -92,12 +123,178 @@ class OP(ABC):
         """
         init method
         """
+        self._initShared()
+
+    def _initShared(self):
+        """ Create the objects shared by the eigenpairs computed with this operator.
+
+        Called by `__init__` and `setnu0`, thus before any concurrent use in
+        `getDerivatives`. The subclasses may not call `__init__`.
+        """
+        with _PLAN_LOCK:
+            if not hasattr(self, '_shared_lock'):
+                self._shared_lock = threading.Lock()
+                self._dK_cache = MatrixCache(gopts['dK_cache_max_bytes'])
+                self._stats = Stats(self.__class__.__name__)
+                self._rhs_plans = {}
 
     def setnu0(self,nu0):
         """
         Set the nominal value of the parameter [mandatory]
         """
+        self._initShared()
         self.nu0 = nu0
+        # the cached matrix derivatives depend on nu0
+        self._dK_cache.clear()
+        # with an affine description, update the operator matrices
+        if self.affine is not None:
+            self._affine_dnu = {}
+            self.K = [self._affineSum(Kid, 0) for Kid in range(len(self.affine))]
+
+    @property
+    def affine(self):
+        """ The affine description of the operator matrices, see `setAffine`.
+        None if the operator is described by `K` and `dK`.
+        """
+        return getattr(self, '_affine', None)
+
+    def setAffine(self, K, flda):
+        """ Describe the operator matrices as sums of fixed matrices times scalar
+        functions of nu.
+
+        $$ \mathbf{K}_i(\nu) = \sum_j f_{ij}(\nu) \mathbf{A}_{ij} $$
+
+        The derivatives of the scalar functions are computed by the library, see
+        the `nu_func` module. `K` and `dK` are created from this description.
+        In `getRHS`, each fixed matrix is applied only once per derivative order
+        and no matrix derivative is built. `setnu0` must be called before.
+
+        Parameters
+        ----------
+        K : list
+            for each operator matrix, the list of `(A_ij, f_ij)` tuples, where
+            `f_ij(n, nu)` returns the n-th derivative of the scalar function
+            (None for a constant equal to 1)
+        flda : list
+            the functions of the eigenvalue, see `lda_func`
+        """
+        self._affine = [list(Ki) for Ki in K]
+        self.flda = flda
+        self.dK = [partial(self._affinedK, Kid) for Kid in range(len(K))]
+        # update K and clear the caches
+        self.setnu0(self.nu0)
+
+    def _prepareAffine(self, N):
+        """ Compute the derivatives of order 0 to N of the scalar functions of
+        the affine description at nu0.
+
+        The table is replaced and never modified in place, thus the eigenpairs
+        computed concurrently always read a consistent table.
+        """
+        with self._shared_lock:
+            table = self._affine_dnu
+            new = {}
+            for Kid, Ki in enumerate(self.affine):
+                for j, (_, f) in enumerate(Ki):
+                    d = table.get((Kid, j))
+                    if d is None or len(d) <= N:
+                        if f is None:
+                            d = np.zeros(N+1, dtype=complex)
+                            d[0] = 1.
+                        else:
+                            d = np.array([f(k, self.nu0) for k in range(N+1)], dtype=complex)
+                    new[(Kid, j)] = d
+            self._affine_dnu = new
+
+    def _getAffineDerivatives(self, Kid, n):
+        """ Get the derivatives of order 0 to n of the scalar functions of K[Kid].
+
+        Returns
+        -------
+        dfnu : list
+            for each term, the array of the derivatives at nu0
+        """
+        table = self._affine_dnu
+        keys = [(Kid, j) for j in range(len(self.affine[Kid]))]
+        if any(k not in table or len(table[k]) <= n for k in keys):
+            self._prepareAffine(n)
+            table = self._affine_dnu
+        return [table[k] for k in keys]
+
+    def _affinedK(self, Kid, n):
+        """ Get the n-th derivative of K[Kid] from its affine description.
+
+        Returns
+        -------
+        dK : matrix or 0
+            the matrix derivative, 0 if it vanishes
+        """
+        if n == 0:
+            return self.K[Kid]
+        return self._affineSum(Kid, n)
+
+    def _affineSum(self, Kid, n):
+        """ Compute sum_j f_ij^(n)(nu0) A_ij, 0 if all the terms vanish.
+        """
+        dK = None
+        for (A, _), d in zip(self.affine[Kid], self._getAffineDerivatives(Kid, n)):
+            if d[n] != 0:
+                dK = A*d[n] if dK is None else dK + A*d[n]
+        return 0 if dK is None else dK
+
+    @property
+    def dKcache(self):
+        """ The LRU cache of the evaluated matrix derivatives `dK[i](n)`.
+
+        The cache is created by `setnu0`, with a budget of
+        `gopts['dK_cache_max_bytes']` bytes. Use `dKcache.resize` to change it.
+        The keys `(Kid, n)` do not describe the operator state, thus the cache
+        must be cleared, with `dKcache.clear()`, if `K` or `dK` are modified
+        without `setnu0`.
+        """
+        if not hasattr(self, '_dK_cache'):
+            self._initShared()
+        return self._dK_cache
+
+    @property
+    def stats(self):
+        """ The profiling of the operator, see the `stats` module.
+
+        The counters 'dK_eval' and 'dK_hit' give the number of evaluated and of
+        cached matrix derivatives.
+        """
+        if not hasattr(self, '_stats'):
+            self._initShared()
+        return self._stats
+
+    def getdK(self, Kid, n, stats=None, order=None):
+        """ Get the n-th derivative of the matrix K[Kid] using the cache.
+
+        Parameters
+        ----------
+        Kid : int
+            the index of the matrix in K
+        n : int
+            the derivative order
+        stats : Stats, optional
+            other statistics where the cache hit or miss is also counted
+        order : int, optional
+            the eigenvalue derivative order used to count in `stats`
+
+        Returns
+        -------
+        dK : matrix or 0
+            the matrix derivative, 0 if it vanishes
+        """
+        cache = self.dKcache
+        name = 'dK_hit' if (Kid, n) in cache else 'dK_eval'
+        # the matrix itself is not a copy and is not counted in the budget
+        M = cache.get((Kid, n), lambda: self.dK[Kid](n),
+                      size=lambda M: 0 if M is self.K[Kid] else None)
+        self.stats.count(name)
+        if stats is not None:
+            stats.count(name, order=order)
+        return M
 
 
     def createL(self,lda):
@@ -137,7 +334,7 @@ class OP(ABC):
    
 
 
-    def createDL_ldax(self,vp):
+    def createDL_ldax(self,vp,left=False):
         """
         Create Vector L1x for the bordered matrix. This vector is \(\partial_\lambda L x\) computed at nu0
         
@@ -147,6 +344,8 @@ class OP(ABC):
         -----------
         vp : Eig
             the eigenvalue object
+        left : bool
+            if True, compute \( (\partial_\lambda L)^T y \) with the left eigenvector `vp.y`
         
         Returns
         --------
@@ -155,21 +354,80 @@ class OP(ABC):
         """
         # init L1x_
         lda= vp.lda        
-        x= adaptVec(vp.x,self._lib)
+        x= adaptVec(vp.y if left else vp.x,self._lib)
         L1x= adaptVec(x.duplicate(),self._lib) 
         L1x.set(0.)   
         
         # loop over opertor matrices             
         for i,Ki in enumerate(self.K):    
-            dflda = lda_func._dlda_flda[self.flda[i]](lda)            
+            dflda = lda_func.dfdlda(self.flda[i])(lda)            
             if dflda != 0:  
                 # matrix operation with the adapter return a real matrix or vector type                             
-                L1x.obj += adaptMat(Ki,self._lib).dot(  x.dot( dflda ) )
+                Ki_ = adaptMat(Ki,self._lib)
+                L1x.obj += (Ki_.tdot if left else Ki_.dot)(  x.dot( dflda ) )
                 
         # store results       
         return L1x.obj
         
-    def getRHS(self,vp,n):
+    def _getRHSPlan(self, n):
+        """ Get the precompiled plan used to assemble the RHS at order n.
+
+        The plan depends only on the structure of the operator (number of
+        matrices and eigenvalue dependency), not on the eigenpair. It is built
+        once from the multinomial index and stored for all the eigenpairs
+        computed with this operator.
+
+        For each matrix `Kid`, the plan is a list of `(m0, terms)` where `m0`
+        is the derivative order of the matrix and `terms` contains the
+        `(m1, m2, coef)` tuples of the eigenvector derivative order, the eigenvalue
+        function derivative order (None if `flda[Kid]` is None) and the
+        multinomial coefficient. The terms that do not belong to the RHS are
+        already removed.
+
+        Parameters
+        ----------
+        n : int
+            the derivative order
+
+        Returns
+        -------
+        plan : list
+            the list of `(m0, terms)` for each matrix of K
+        """
+        if not hasattr(self, '_rhs_plans'):
+            self._initShared()
+        plans = self._rhs_plans
+        # the plan depends on n and on the number of terms for each matrix
+        key = (n, tuple(f is None for f in self.flda))
+        if key in plans:
+            return plans[key]
+
+        plan = []
+        for flda_ in self.flda:
+            # How many terms for liebnitz 2 or 3
+            if flda_ is None:
+                ntermi, skip = 2, (0, n)        # K_0**(0) x**(n)
+            else:
+                ntermi, skip = 3, (0, n, 0)     # K_1**(0) x**(n) dla**(0)
+            # multinomial index, sorted to be sure that m0 is changing slowly
+            mind, mcoef = multinomial_index_coefficients(ntermi, n)
+            groups = []
+            for m, coef in zip(mind, mcoef):
+                # check if index belong to RHS
+                if m == skip:
+                    continue
+                term = (m[1], m[2] if ntermi == 3 else None, coef)
+                if groups and groups[-1][0] == m[0]:
+                    groups[-1][1].append(term)
+                else:
+                    groups.append((m[0], [term]))
+            plan.append(groups)
+
+        # if built concurrently, keep the first one
+        with _PLAN_LOCK:
+            return plans.setdefault(key, plan)
+
+    def getRHS(self,vp,n,left=False):
         """
         Get (compute) RHS vector value use in the Andrew, Chu, Lancaster method.
         Function of L, D and derivative of eigenvalue and eigenvector
@@ -189,10 +447,19 @@ class OP(ABC):
         flda = [None, lin, quad] that contains the function of the eigenvalue. The function will return their nth derivatives
         for general dependancy Faa di Bruno foruma should be used.
 
+        The multinomial terms are grouped by matrix derivative order (see
+        `_getRHSPlan`). For each group, the weighted eigenvector derivatives
+        are summed first and the matrix derivative is applied only once.
+
         Parameters
         ---------
         vp : Eig
             the eigenvalue object
+        n : int
+            the derivative order
+        left : bool
+            if True, get the RHS of the left eigenvector derivatives, computed
+            with `vp.dy` and the transposed matrices
         
         Returns
         -------
@@ -203,61 +470,158 @@ class OP(ABC):
         lib = self._lib
         # adapt the class interface to be independant of the library
         x= adaptVec(vp.x,self._lib)
+        dx = vp.dy if left else vp.dx
 
         # init
         F= adaptVec(x.duplicate(),lib) # RHS same shape as eigenvector
         F.set(0.)       
-                
-        # number of terms, usually 3 (K_i * f_i(lda) * xi), sometimes 2
-        NTERM = 3          
-        # tuple to remove, because not in the RHS
-        #        (Matrix, eigenvector, eigenvalue)
-        # Remarks : the lda**(n) are remove in the lda_func
-        skip2 = {(0,n)} # K_0**(0) x**(n)
-        skip3 = {(0,n,0)} # K_1**(0) x**(n) dla**(0)
-                
-        # init matrix derivative index at previous step, to force 1st computation
-        m0old=-1
+
+        affine = self.affine
         # loop over operator matrices
-        for (Kid,K) in enumerate(self.K):
-            # TODO caching the matrix
-            # How many terms for liebnitz 2 or 3
-            if self.flda[Kid]==None:
-                ntermi=NTERM-1 # 2
-                skip_set = skip2                
-            else:
-                ntermi=NTERM # 3
-                skip_set = skip3
-                
-            # multinomial index
-            mind,mcoef=multinomial_index_coefficients(ntermi, n)
-            # on va aussi avoir besoin des coef!
-            for (mi,m) in enumerate(mind):                
-                # check if index belong to RHS
-                if (m not in skip_set):  
-                    """ computing the operator derivative may be long, the matrix is cached 
-                    until its derivation order change
-                    """
-                    if m[0]!=m0old:
-                        # if matrix order derivative has changed since last computation, compute it
-                        dK_m0_ = self.dK[Kid](m[0])
-                    if dK_m0_ is not int(0):
-                        # if matrix derivative do not vanish...
-                        dK_m0 = adaptMat(dK_m0_,lib) # FIXME may be 0
-                        dx_m1 = adaptVec(vp.dx[m[1]], lib)       # normaly never 0
-                        # compute the eigenvalue m[2]-th derivative, return 0 if skiped
-                        if ntermi == 2:
-                            F.obj -=  dK_m0.dot( dx_m1.dot(mcoef[mi]))                            
-                        else:      
-                            # filter if lda**(n) or d_lda L lda**(n) because not in RHS
-                            dlda_m = self.flda[Kid](m[2],n,vp.dlda)                        
-                            if abs(dlda_m) != 0:
-                                F.obj -= dK_m0.dot( dx_m1.dot( dlda_m*mcoef[mi] ) )
-                m0old=m[0]
-                            
-                   
+        for Kid, groups in enumerate(self._getRHSPlan(n)):
+            flda_ = self.flda[Kid]
+            # derivatives of the eigenvalue function, computed once per order
+            dflda = {}
+            if affine is not None:
+                # derivatives of the scalar functions of each fixed matrix
+                dfnu = self._getAffineDerivatives(Kid, n)
+                acc = [([], []) for _ in dfnu]
+            for m0, terms in groups:
+                if affine is not None:
+                    if not any(d[m0] != 0 for d in dfnu):
+                        continue
+                else:
+                    # computing the operator derivative may be long, done once per group
+                    dK_m0_ = self.getdK(Kid, m0, vp.stats, n)
+                    if dK_m0_ is int(0):
+                        continue
+                # sum the weighted eigenvector derivatives
+                index, coefs = [], []
+                for (m1, m2, coef) in terms:
+                    if m2 is not None:
+                        # filter if lda**(n) or d_lda L lda**(n) because not in RHS
+                        if m2 not in dflda:
+                            dflda[m2] = flda_(m2, n, vp.dlda)
+                        if abs(dflda[m2]) == 0:
+                            continue
+                        coef = dflda[m2]*coef
+                    index.append(m1)
+                    coefs.append(coef)
+                if not index:
+                    continue
+                if affine is not None:
+                    # scale by the derivative of the scalar function, the
+                    # fixed matrix is applied after the loop
+                    for d, (index_j, coefs_j) in zip(dfnu, acc):
+                        if d[m0] != 0:
+                            index_j.extend(index)
+                            coefs_j.extend(d[m0]*c for c in coefs)
+                else:
+                    y = _combine(dx, index, coefs, lib)
+                    dK_m0_ = adaptMat(dK_m0_, lib)
+                    F.obj -= dK_m0_.tdot(y) if left else dK_m0_.dot(y)
+                    vp.stats.count('matvec', order=n)
+            if affine is not None:
+                for (A, _), (index_j, coefs_j) in zip(affine[Kid], acc):
+                    if index_j:
+                        y = _combine(dx, index_j, coefs_j, lib)
+                        A_ = adaptMat(A, lib)
+                        F.obj -= A_.tdot(y) if left else A_.dot(y)
+                        vp.stats.count('matvec', order=n)
+
         return F.obj  
+
+    def getBilinearSeries(self, vp, N):
+        r""" Compute the derivatives of \( a_i(\nu) = y(\nu)^T K_i(\nu) x(\nu) \)
+        up to order N, from the available derivatives of x and y.
+
+        With n derivatives of x and y, the eigenvalue derivatives up to order
+        2n+1 can be obtained from these scalar functions (see
+        `Eig.getDerivativesTwoSided`). Only available for full vectors (numpy and
+        scipysp). The matrix derivative of order j0 is only applied to the
+        derivatives of x of order j2 <= N - j0, that is about 3/2 n**2 products by matrix
+        for N = 2n+1.
+
+        Parameters
+        ----------
+        vp : Eig
+            the eigenvalue object, with the derivatives `dx` and `dy`
+        N : int
+            the maximal derivative order
+
+        Returns
+        -------
+        a : array
+            `a[i, k]` is the k-th derivative of \( a_i \)
+        """
+        n = min(len(vp.dx), len(vp.dy)) - 1
+        X = np.asarray(vp.dx[:n+1])
+        Y = np.asarray(vp.dy[:n+1])
+        a = np.zeros((len(self.K), N+1), dtype=complex)
+        fact = factorial(np.arange(N+1))
+        # all the (j1, j2) orders of y and x
+        J1, J2 = np.meshgrid(np.arange(n+1), np.arange(n+1), indexing='ij')
+        for Kid in range(len(self.K)):
+            for j0 in range(N+1):
+                dK_j0_ = self.getdK(Kid, j0, vp.stats, N)
+                if dK_j0_ is int(0):
+                    continue
+                # only the orders j1 + j2 <= N - j0 contribute
+                m = min(n, N - j0) + 1
+                j1, j2 = J1[:m, :m], J2[:m, :m]
+                k = j0 + j1 + j2
+                keep = k <= N
+                # G[j1, j2] = y^(j1)^T K^(j0) x^(j2)
+                G = Y[:m] @ (dK_j0_ @ X[:m].T)
+                vp.stats.count('matvec', m, order=N)
+                coef = fact[k[keep]] / (fact[j0]*fact[j1[keep]]*fact[j2[keep]])
+                np.add.at(a[Kid], k[keep], coef*G[keep])
+        return a
     
+    def getDerivatives(self, eigs, N, workers=1, keep_factor=False):
+        """ Compute the N first derivatives of several eigenpairs of this operator.
+
+        The eigenpairs are independent and can be computed concurrently in a
+        thread pool. The factorization and the solves of the bordered matrix
+        (SuperLU, UMFPACK, LAPACK) and the matrix-vector products release the GIL.
+        All the eigenpairs share the RHS plans, the cached matrix derivatives
+        (`dKcache`) and the derivatives of the affine scalar functions of the
+        operator. They are created before the threads start or are thread-safe.
+
+        Parameters
+        ----------
+        eigs : list
+            the list of Eig objects
+        N : int
+            the number derivative to compute
+        workers : int
+            the number of threads. With petsc, the eigenpairs are always
+            computed one after the other since the parallelism is handled by MPI.
+        keep_factor : bool
+            keep the factorizations of the bordered matrices to extend the
+            derivatives later, see `Eig.getDerivatives`
+
+        Returns
+        -------
+        eigs : list
+            the list of Eig objects, with their derivatives
+        """
+        if self.affine is not None:
+            # the eigenpairs only read the table of the scalar functions
+            self._prepareAffine(N)
+        with self.stats.timer('getDerivatives', N):
+            if workers is None or workers <= 1 or len(eigs) < 2 or self._lib == 'petsc':
+                for vp in eigs:
+                    vp.getDerivatives(N, self, keep_factor)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(vp.getDerivatives, N, self, keep_factor)
+                               for vp in eigs]
+                    # get the results to raise the possible exceptions
+                    for future in futures:
+                        future.result()
+        return eigs
+
     def createSolver(self,pb_type='gen',opts=None):
         """ Factory function that create a eigSolver object. Computation are 
         delegated to the object define in `SOLVER_DICT`
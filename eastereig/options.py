@@ -23,10 +23,25 @@ concerns petsc and slepc solvers (for the moment).
   2. Sometimes mumps crash with high fill. The problem arise if the prediction/mem 
   allocation is too different (default 20%) from the real computation. 
   Setting 'icntl_14'=50, fix the problem.
+  3. The evaluated operator derivative matrices `dK[i](n)` are cached by each
+  `OP` instance up to 'dK_cache_max_bytes' bytes.
+  4. With 'factor_reuse' (opt-in), the released petsc KSPs of the bordered
+  matrix are reused for the same sparsity pattern, with their symbolic
+  analysis, see `factor`. It has no effect with numpy and scipysp.
+  5. With `getDerivatives(..., mixed_precision=True)`, the iterative refinement
+  stops when the backward error is below 'refine_tol' or after 'refine_maxit' steps.
+  6. With 'silent', the messages of the derivatives computation and of the numpy
+  and scipysp eigenvalue solvers are not printed.
+  The timings are always recorded in the `stats` attribute of `Eig`, `OP` and `EP`.
 
 """
 
 gopts ={'direct_solver_name':'mumps',                       # petsc name of the direct solver
        'direct_solver_petsc_options_name':'mat_mumps_',     # petsc direct solver name of in `PETSc.Options`
        'direct_solver_petsc_options_dict':{'icntl_14':50},  # dictionnary of the petsc options name, value
+       'dK_cache_max_bytes':2**30,                          # memory budget of the OP derivative matrices cache
+       'factor_reuse':False,                                # reuse the petsc symbolic factorization of the bordered matrix
+       'refine_tol':1e-14,                                  # backward error of the mixed precision solves
+       'refine_maxit':10,                                   # max. number of iterative refinement steps
+       'silent':False,                                      # no printing during the derivatives computation and the solves
        }
\ No newline at end of file
@@ -0,0 +1,533 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define the evaluation engine of the eigenvalue reconstructions
+
+The coefficients of the Taylor, Padé, Puiseux and analytic auxiliary functions
+(AAF) reconstructions are computed once when the evaluator is created. The
+evaluation uses Horner scheme, in \\( \\sqrt{\\nu - \\nu^*} \\) for the Puiseux
+series. The points are processed in fixed-size chunks, possibly on a thread pool
+(numpy releases the GIL), and the results can be written in caller-provided
+buffers with `out`.
+
+The `Eig` methods `taylor`, `pade`, `puiseux` and `anaAuxFunc` use these evaluators.
+The reconstructions for all the truncation orders are obtained in one pass with
+`partialSums` and `wynn`, see `Eig.convergenceTable`.
+Several evaluators can be frozen in a `Surrogate`, to evaluate many modes at once
+and to share them with other processes through a memory-mapped file.
+
+Examples
+--------
+>>> import numpy as np
+>>> tay = TaylorEvaluator([1., 1., 0.5, 1/6.], 0.)
+>>> z = np.linspace(-0.1, 0.1, 7).reshape(7, 1)
+>>> out = np.empty(z.shape, dtype=complex)
+>>> res = tay(z, out=out, chunk=3, workers=2)
+>>> res is out, np.allclose(out, 1 + z + z**2/2 + z**3/6)
+(True, True)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# kind of the modes stored in a `Surrogate`
+_RATIONAL, _PUISEUX, _AAF = 0, 1, 2
+
+
+def horner(c, z, out=None):
+    """ Evaluate the polynomial with ascending coefficients c at z with Horner scheme.
+
+    Parameters
+    ----------
+    c : array_like
+        the polynomial coefficients in ascending order
+    z : array
+        the points
+    out : array, optional
+        the complex array where the result is stored
+
+    Returns
+    -------
+    out : array
+        the polynomial values
+
+    Examples
+    --------
+    >>> horner([1., 2., 3.], np.array([0., 1., 2.])).real
+    array([ 1.,  6., 17.])
+    """
+    if out is None:
+        out = np.empty(np.shape(z), dtype=complex)
+    out[...] = c[-1] if len(c) else 0.
+    for ck in c[-2::-1]:
+        np.multiply(out, z, out=out)
+        out += ck
+    return out
+
+
+def partialSums(c, z):
+    """ Get all the partial sums of a power series at z, in one pass.
+
+    Parameters
+    ----------
+    c : array_like
+        the N coefficients in ascending order
+    z : array_like
+        the points
+
+    Returns
+    -------
+    S : array
+        the partial sums, `S[n-1]` is the sum of the n first terms, shape (N,) + z.shape
+
+    Examples
+    --------
+    >>> partialSums([1., 2., 3.], 2.).real
+    array([ 1.,  5., 17.])
+    """
+    z = np.asarray(z)
+    S = np.empty((len(c),) + z.shape, dtype=complex)
+    zk = np.ones(z.shape, dtype=complex)
+    acc = np.zeros(z.shape, dtype=complex)
+    for k, ck in enumerate(c):
+        acc += ck*zk
+        S[k] = acc
+        zk *= z
+    return S
+
+
+def wynn(S):
+    """ Get the staircase sequence of Padé approximants from the partial sums with
+    Wynn's epsilon algorithm.
+
+    The n-th entry is the Padé approximant [n//2 - 1 + n%2 / n//2], obtained from the
+    n first terms, as in `Eig.pade`. The partial sum of order -1 is taken as 0.
+    The cost is O(N^2) operations per point, without solving any linear system.
+
+    Parameters
+    ----------
+    S : array
+        the partial sums, as given by `partialSums`
+
+    Returns
+    -------
+    R : array
+        the Padé approximants, same shape as S
+
+    Examples
+    --------
+    >>> from eastereig.utils import pade
+    >>> from scipy.special import factorial
+    >>> c = 1. / factorial(np.arange(6))
+    >>> R = wynn(partialSums(c, 1.5))
+    >>> p, q = pade(c, 3)
+    >>> abs(R[5] - p(1.5)/q(1.5)) < 1e-12
+    True
+    """
+    N = len(S)
+    R = np.empty_like(S)
+    # eps_{-1} and eps_0
+    prev = np.zeros((N + 1,) + S.shape[1:], dtype=complex)
+    cur = np.concatenate((np.zeros((1,) + S.shape[1:], dtype=complex), S))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for col in range(N + 1):
+            if col % 2 == 0:
+                # the even columns contain the Padé approximants
+                if col >= 1:
+                    R[col - 1] = cur[0]
+                if col < N:
+                    R[col] = cur[1]
+            if len(cur) < 2:
+                break
+            prev, cur = cur, prev[1:len(cur)] + 1. / (cur[1:] - cur[:-1])
+    for k in range(1, N):
+        R[k] = np.where(np.isfinite(R[k]), R[k], R[k - 1])
+    return R
+
+
+class Evaluator:
+    """ Base class of the evaluators.
+
+    The subclasses define the coefficients, the origin of the series and the
+    `_eval(z, outs)` method that computes the `nout` outputs for the 1D chunk
+    `z = points - origin`.
+
+    Parameters
+    ----------
+    chunk : int
+        the number of points of each chunk
+    workers : int
+        the number of threads used to evaluate the chunks
+    """
+
+    nout = 1
+
+    def __init__(self, origin, chunk=2**16, workers=1):
+        self.origin = origin
+        self.chunk = chunk
+        self.workers = workers
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return "Instance of {} @{}".format(self.__class__.__name__, self.origin)
+
+    def _eval(self, z, outs):
+        raise NotImplementedError
+
+    def _pack(self):
+        """ Get the modes as a list of (kind, sign, origin, c1, c2) tuples, see `Surrogate`.
+        """
+        raise NotImplementedError
+
+    def __call__(self, points, out=None, chunk=None, workers=None):
+        """ Evaluate the reconstruction at points.
+
+        Parameters
+        ----------
+        points : array_like
+            the points, give the absolute value, not the relative % nu0
+        out : array or tuple of arrays, optional
+            the contiguous complex buffers with the shape of points where the
+            results are written. A tuple is required if `nout` > 1
+        chunk, workers : int, optional
+            override the values given at the creation
+
+        Returns
+        -------
+        out : array or tuple of arrays
+            the values, with the shape of points
+        """
+        chunk = self.chunk if chunk is None else chunk
+        workers = self.workers if workers is None else workers
+        points = np.asarray(points)
+        if out is None:
+            outs = tuple(np.empty(points.shape, dtype=complex) for _ in range(self.nout))
+        else:
+            outs = (out,) if self.nout == 1 else tuple(out)
+            for o in outs:
+                if o.shape != points.shape or o.dtype != complex or not o.flags.c_contiguous:
+                    raise ValueError('out must be a contiguous complex array with the shape of points')
+        flat_points = points.reshape(-1)
+        flat_outs = [o.reshape(-1) for o in outs]
+
+        def process(start):
+            stop = min(start + chunk, flat_points.size)
+            z = flat_points[start:stop] - self.origin
+            self._eval(z, [o[start:stop] for o in flat_outs])
+
+        starts = range(0, flat_points.size, chunk)
+        if workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(process, starts))
+        else:
+            for start in starts:
+                process(start)
+        if points.ndim == 0:
+            outs = tuple(o[()] for o in outs)
+        return outs[0] if self.nout == 1 else outs
+
+
+class TaylorEvaluator(Evaluator):
+    """ Evaluate a Taylor series.
+
+    Parameters
+    ----------
+    c : array_like
+        the Taylor coefficients in ascending order
+    origin : complex
+        the expansion point
+    """
+
+    def __init__(self, c, origin, **kwargs):
+        super().__init__(origin, **kwargs)
+        self.c = np.asarray(c, dtype=complex)
+
+    def _eval(self, z, outs):
+        horner(self.c, z, outs[0])
+
+    def _pack(self):
+        return [(_RATIONAL, 1., self.origin, self.c, np.ones(1))]
+
+
+class PadeEvaluator(Evaluator):
+    """ Evaluate a Padé approximant p/q.
+
+    Parameters
+    ----------
+    p, q : array_like
+        the coefficients of the numerator and of the denominator in ascending order
+    origin : complex
+        the expansion point
+    """
+
+    def __init__(self, p, q, origin, **kwargs):
+        super().__init__(origin, **kwargs)
+        self.p = np.asarray(p, dtype=complex)
+        self.q = np.asarray(q, dtype=complex)
+
+    def _eval(self, z, outs):
+        horner(self.p, z, outs[0])
+        outs[0] /= horner(self.q, z)
+
+    def _pack(self):
+        return [(_RATIONAL, 1., self.origin, self.p, self.q)]
+
+
+class PuiseuxEvaluator(Evaluator):
+    """ Evaluate the two branches of a Puiseux series
+    a_0 +/- a_1 s + a_2 s**2 +/- ..., with s = sqrt(nu - EP_loc).
+
+    Parameters
+    ----------
+    a : array_like
+        the Puiseux coefficients
+    EP_loc : complex
+        the EP
+    """
+
+    nout = 2
+
+    def __init__(self, a, EP_loc, **kwargs):
+        super().__init__(EP_loc, **kwargs)
+        self.a = np.asarray(a, dtype=complex)
+
+    def _eval(self, z, outs):
+        s = np.sqrt(z)
+        # even and odd parts in s**2 = z, f = E(z) +/- s O(z)
+        E = horner(self.a[0::2], z)
+        O = horner(self.a[1::2], z)
+        O *= s
+        np.add(E, O, out=outs[0])
+        np.subtract(E, O, out=outs[1])
+
+    def _pack(self):
+        return [(_PUISEUX, sign, self.origin, self.a[0::2], self.a[1::2]) for sign in (1., -1.)]
+
+
+class AAFEvaluator(Evaluator):
+    """ Evaluate the analytic auxiliary functions reconstruction
+    (T_g +/- sqrt(T_h))/2.
+
+    Parameters
+    ----------
+    gTay, hTay : array_like
+        the Taylor coefficients of g and h
+    origin : complex
+        the expansion point
+    """
+
+    nout = 2
+
+    def __init__(self, gTay, hTay, origin, **kwargs):
+        super().__init__(origin, **kwargs)
+        self.gTay = np.asarray(gTay, dtype=complex)
+        self.hTay = np.asarray(hTay, dtype=complex)
+
+    def _eval(self, z, outs):
+        g = horner(self.gTay, z)
+        sh = np.sqrt(horner(self.hTay, z))
+        np.add(g, sh, out=outs[0])
+        np.subtract(g, sh, out=outs[1])
+        outs[0] *= 0.5
+        outs[1] *= 0.5
+
+    def _pack(self):
+        return [(_AAF, sign, self.origin, self.gTay, self.hTay) for sign in (1., -1.)]
+
+
+class Surrogate:
+    """ Immutable multi-mode surrogate of the eigenvalues.
+
+    The reconstructions of many eigenvalues are packed in a single complex array,
+    one row by mode : `[kind, sign, origin, c1..., c2...]`, where the coefficients
+    c1 and c2 are padded with zeros. The modes are evaluated as
+
+      - Taylor and Padé : c1(z)/c2(z),
+      - Puiseux : c1(z) + sign sqrt(z) c2(z), with the even and odd coefficients,
+      - AAF : (c1(z) + sign sqrt(c2(z)))/2, with the Taylor coefficients of g and h,
+
+    with z = nu - origin. This array is saved as a `.npy` file that can be
+    memory-mapped by worker processes.
+
+    Parameters
+    ----------
+    data : array
+        the packed modes, see `fromEvaluators` to create it
+
+    Examples
+    --------
+    >>> import numpy as np, tempfile, os
+    >>> tay = TaylorEvaluator([1., 2., 1.], 0.5)
+    >>> pad = PadeEvaluator([1.], [1., -1.], 0.)
+    >>> pui = PuiseuxEvaluator([0., 1., 0.5], 1j)
+    >>> sur = Surrogate.fromEvaluators([tay, pad, pui])
+    >>> sur.nmodes
+    4
+    >>> nu = np.linspace(0.1, 0.3, 5)
+    >>> ref = np.column_stack((tay(nu), pad(nu)) + pui(nu))
+    >>> res = sur.evaluate(nu, chunk=2, workers=2)
+    >>> res.shape, np.allclose(res, ref)
+    ((5, 4), True)
+
+    Save it and load it with a memory-map
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'surrogate.npy')
+    >>> sur.save(filename)
+    >>> sur2 = Surrogate.load(filename)
+    >>> np.allclose(sur2.evaluate(nu, modes=[3, 0]), ref[:, [3, 0]])
+    True
+    """
+
+    def __init__(self, data):
+        """ Init the instance from the packed array.
+        """
+        self._data = data
+        if isinstance(data, np.ndarray) and data.flags.writeable:
+            data.flags.writeable = False
+
+    @classmethod
+    def fromEvaluators(cls, evaluators):
+        """ Pack the evaluators in a surrogate.
+
+        The `PuiseuxEvaluator` and `AAFEvaluator` give two modes, one for each branch.
+
+        Parameters
+        ----------
+        evaluators : iterable
+            the `Evaluator` instances, e.g. obtained from `Eig._reconstruction`
+
+        Returns
+        -------
+        sur : Surrogate
+            the surrogate
+        """
+        modes = [m for ev in evaluators for m in ev._pack()]
+        M = max(max(len(m[3]), len(m[4])) for m in modes)
+        data = np.zeros((len(modes), 3 + 2*M), dtype=complex)
+        for i, (kind, sign, origin, c1, c2) in enumerate(modes):
+            data[i, :3] = kind, sign, origin
+            data[i, 3:3+len(c1)] = c1
+            data[i, 3+M:3+M+len(c2)] = c2
+        return cls(data)
+
+    @classmethod
+    def fromEigs(cls, eigs, kind='taylor', n=-1):
+        """ Create the surrogate from the Taylor or Padé reconstruction of eigenvalues.
+
+        Parameters
+        ----------
+        eigs : iterable
+            the `Eig` instances, with their derivatives
+        kind : str
+            'taylor' or 'pade'
+        n : int
+            the number of terms, -1 to use all the derivatives
+
+        Returns
+        -------
+        sur : Surrogate
+            the surrogate
+        """
+        return cls.fromEvaluators([vp._reconstruction(kind, n) for vp in eigs])
+
+    def save(self, filename):
+        """ Save the packed array in a `.npy` file.
+        """
+        np.save(filename, np.asarray(self._data))
+
+    @classmethod
+    def load(cls, filename, mmap=True):
+        """ Load the surrogate saved with `save`, by default with a read-only memory-map.
+        """
+        return cls(np.load(filename, mmap_mode='r' if mmap else None))
+
+    @property
+    def nmodes(self):
+        """ The number of modes. """
+        return self._data.shape[0]
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return "Instance of {} with {} modes".format(self.__class__.__name__, self.nmodes)
+
+    def evaluate(self, points, modes=None, out=None, chunk=2**14, workers=1):
+        """ Evaluate the modes at points.
+
+        Parameters
+        ----------
+        points : array_like
+            the points, flattened
+        modes : iterable, optional
+            the index of the modes, all by default
+        out : array, optional
+            the complex buffer of shape (npoints, nmodes) where the result is written
+        chunk : int
+            the number of points of each chunk
+        workers : int
+            the number of threads used to evaluate the chunks
+
+        Returns
+        -------
+        out : array
+            the values, with shape (npoints, nmodes)
+        """
+        points = np.asarray(points).reshape(-1)
+        modes = np.arange(self.nmodes) if modes is None else np.asarray(modes)
+        if out is None:
+            out = np.empty((points.size, len(modes)), dtype=complex)
+        elif out.shape != (points.size, len(modes)):
+            raise ValueError('out must have the shape (npoints, nmodes)')
+        data = np.asarray(self._data[modes])
+        M = (data.shape[1] - 3) // 2
+        kinds = data[:, 0].real.astype(int)
+        groups = []
+        for kind in np.unique(kinds):
+            cols = np.flatnonzero(kinds == kind)
+            d = data[cols]
+            c1, c2 = d[:, 3:3+M].T, d[:, 3+M:].T
+            # drop the padding shared by all the modes of the group
+            c1 = c1[:max(np.flatnonzero(c1.any(axis=1)).max(initial=0) + 1, 1)]
+            c2 = c2[:max(np.flatnonzero(c2.any(axis=1)).max(initial=0) + 1, 1)]
+            groups.append((kind, cols, d[:, 1], d[:, 2], c1, c2))
+
+        def process(start):
+            stop = min(start + chunk, points.size)
+            for kind, cols, sign, origin, c1, c2 in groups:
+                z = points[start:stop, None] - origin
+                v1, v2 = horner(c1, z), horner(c2, z)
+                if kind == _RATIONAL:
+                    v1 /= v2
+                elif kind == _PUISEUX:
+                    v2 *= np.sqrt(z)
+                    v2 *= sign
+                    v1 += v2
+                else:
+                    v1 += sign*np.sqrt(v2)
+                    v1 *= 0.5
+                out[start:stop, cols] = v1
+
+        starts = range(0, points.size, chunk)
+        if workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(process, starts))
+        else:
+            for start in starts:
+                process(start)
+        return out
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define a reduced order model built from the eigenvector derivatives
+
+The eigenvectors and their derivatives at nu0, stored in `Eig.dx` for several
+modes, are orthonormalized in a basis \\(\\mathbf{V}\\). The operator is projected
+once on this basis
+$$ \\mathbf{V}^H \\mathbf{K}_i(\\nu) \\mathbf{V}, $$
+using its Taylor series in nu, built from `OP.getdK`, or its exact affine
+description if `OP.setAffine` has been used. Then, at each new nu, only a small
+dense polynomial eigenvalue problem is solved. The relative residual of the
+lifted eigenvectors in the full space is used as error indicator. It is computed
+with the same description of the operator in nu, so it does not account for the
+truncation of its Taylor series.
+
+Only the polynomial dependence in lda (`None`, `lda_func.Lda`, `lda_func.Lda2`)
+is supported, with the numpy and scipysp libraries.
+
+Examples
+--------
+>>> import numpy as np
+>>> from eastereig import gopts
+>>> from eastereig.examples.WGimpedance_scipysp import Zscipysp
+>>> z0, k0 = 486.198103097114 + 397.605679264872j, 2*np.pi*200/340.
+>>> gopts['silent'] = True
+>>> op = Zscipysp(z=z0, n=60, h=1., rho=1.2, c=340., k=k0)
+>>> op.createSolver(pb_type='gen')
+>>> _ = op.solver.solve(nev=4, target=0+0j, skipsym=False)
+>>> eigs = op.solver.extract([0, 1])
+>>> for vp in eigs:
+...     vp.getDerivatives(8, op)
+>>> rom = ReducedModel(op, eigs)
+>>> rom.shape
+(60, 8)
+
+Compare with the full model at a new value of nu
+>>> nu = z0 + 20 - 10j
+>>> ref = Zscipysp(z=nu, n=60, h=1., rho=1.2, c=340., k=k0)
+>>> ref.createSolver(pb_type='gen')
+>>> lda_ref = ref.solver.solve(nev=4, target=0+0j, skipsym=False)
+>>> gopts['silent'] = False
+>>> lda, err = rom.solve(nu, target=[vp.lda for vp in eigs])
+>>> [min(abs(lda_ref - l))/abs(l) < 1e-8 for l in lda], (err < 1e-8).all()
+([True, True], True)
+
+Each target gets a different eigenvalue
+>>> lda2, _ = rom.solve(nu, target=[eigs[0].lda, eigs[0].lda])
+>>> lda2[0] != lda2[1]
+True
+"""
+
+import numpy as np
+import scipy.linalg as spl
+from scipy.optimize import linear_sum_assignment
+from scipy.special import factorial
+from . import lda_func
+
+
+class ReducedModel:
+    """ Reduced order model built from the eigenvector derivatives of several modes.
+
+    Parameters
+    ----------
+    op : OP
+        the operator, with `nu0` and the `dK` functions (or the affine description)
+    eigs : iterable
+        the `Eig` instances, with their eigenvector derivatives
+    N : int, optional
+        the number of eigenvector derivatives used by mode, all by default
+    Nk : int, optional
+        the number of terms of the Taylor series of the operator matrices in nu,
+        `N` + 1 by default. Not used with an affine description
+    tol : float
+        the relative tolerance used to drop the linearly dependent vectors
+
+    Attributes
+    ----------
+    V : array
+        the orthonormal basis
+    nu0 : complex
+        the expansion point
+    """
+
+    _DEGREE = {lda_func.Lda: 1, lda_func.Lda2: 2}
+    """ Degree in lda of the supported `flda` functions. """
+
+    def __init__(self, op, eigs, N=None, Nk=None, tol=1e-12):
+        """ Build the basis and project the operator.
+        """
+        if op._lib == 'petsc':
+            raise NotImplementedError('ReducedModel is only available with numpy and scipysp.')
+        self.nu0 = op.nu0
+        self._deg = []
+        for f in op.flda:
+            if f is None:
+                self._deg.append(0)
+            elif f in self._DEGREE:
+                self._deg.append(self._DEGREE[f])
+            else:
+                raise NotImplementedError('Only the polynomial dependence in lda is supported.')
+        self.V = self._basis(eigs, N, tol)
+        N = max(len(vp.dx) for vp in eigs) if N is None else N
+        self._project(op, N + 1 if Nk is None else Nk)
+
+    @staticmethod
+    def _basis(eigs, N, tol):
+        """ Orthonormalize the eigenvector derivatives with a pivoted QR.
+        """
+        Z = np.column_stack([np.asarray(vp.dx[k]) for vp in eigs
+                             for k in range(len(vp.dx) if N is None else min(N, len(vp.dx)))])
+        # the derivatives have very different norms
+        Z = Z / np.linalg.norm(Z, axis=0)
+        Q, R, _ = spl.qr(Z, mode='economic', pivoting=True)
+        d = abs(np.diag(R))
+        return Q[:, :np.count_nonzero(d > tol*d[0])]
+
+    def _project(self, op, Nk):
+        """ Compute the terms of the reduced operator.
+
+        Each term t has a degree in lda, a scalar coefficient function of nu and
+        the projection `Kr[t]` of its matrix. For the error indicator, the full
+        matrices times the basis W_t are only kept through the triangular factor
+        R of [W_0, W_1, ...] = Q R, i.e. the Cholesky factor of the Gram matrix
+        of the W_t, thus the online cost does not depend on the full size.
+        """
+        V = self.V
+        self._tdeg, self._coef, W = [], [], []
+        for Kid, deg in enumerate(self._deg):
+            if op.affine is not None:
+                for A, f in op.affine[Kid]:
+                    self._tdeg.append(deg)
+                    self._coef.append((lambda nu: 1.) if f is None else (lambda nu, f=f: f(0, nu)))
+                    W.append(np.asarray(A @ V))
+            else:
+                for n in range(Nk):
+                    dK = op.getdK(Kid, n)
+                    if isinstance(dK, int) and dK == 0:
+                        continue
+                    self._tdeg.append(deg)
+                    self._coef.append(lambda nu, n=n: (nu - self.nu0)**n / factorial(n))
+                    W.append(np.asarray(dK @ V))
+        self._tdeg = np.array(self._tdeg)
+        self._Kr = np.array([V.conj().T @ w for w in W])
+        self._R = spl.qr(np.hstack(W), mode='r')[0]
+
+    @property
+    def shape(self):
+        """ The size of the full model and of the reduced model. """
+        return self.V.shape
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return "Instance of {} @nu0={} (size {} -> {})".format(self.__class__.__name__,
+                                                              self.nu0, *self.shape)
+
+    def solve(self, nu, target=None, nev=None):
+        """ Solve the reduced eigenvalue problem at nu.
+
+        Parameters
+        ----------
+        nu : complex
+            the parameter value
+        target : complex or iterable, optional
+            if a scalar, the eigenvalues are sorted by distance to target. If
+            iterable, one distinct eigenvalue is returned for each target, such that
+            the sum of the distances is minimal. By
+            default, the eigenvalues are sorted by increasing error indicator
+        nev : int, optional
+            the number of returned eigenvalues, all by default
+
+        Returns
+        -------
+        lda : array
+            the eigenvalues
+        err : array
+            the relative residual of the eigenvectors in the full space
+        """
+        c = np.array([f(nu) for f in self._coef], dtype=complex)
+        p = self._tdeg.max()
+        r = self.V.shape[1]
+        # lda polynomial coefficients A_0 + lda A_1 + ... + lda**p A_p
+        A = [np.tensordot(c[self._tdeg == d], self._Kr[self._tdeg == d], axes=1)
+             if (self._tdeg == d).any() else np.zeros((r, r), dtype=complex)
+             for d in range(p + 1)]
+        # block companion linearization, with z = [y, lda y, ..., lda**(p-1) y]
+        L0 = np.zeros((p*r, p*r), dtype=complex)
+        L1 = np.eye(p*r, dtype=complex)
+        L0[:-r, r:] = np.eye((p-1)*r)
+        L0[-r:] = np.hstack(A[:p])
+        L1[-r:, -r:] = -A[p]
+        lda, Y = spl.eig(L0, L1)
+        keep = np.isfinite(lda)
+        lda, Y = lda[keep], Y[:r, keep]
+        err = self._residual(c, lda, Y)
+        if target is None:
+            order = np.argsort(err)
+        elif np.ndim(target) == 0:
+            order = np.argsort(abs(lda - target))
+        else:
+            # each eigenvalue is associated to one target at most
+            rows, cols = linear_sum_assignment(abs(np.subtract.outer(np.asarray(target), lda)))
+            order = cols[np.argsort(rows)]
+        order = order[:nev]
+        return lda[order], err[order]
+
+    def _residual(self, c, lda, Y):
+        """ Get the relative residual ||K(nu, lda) V y|| / sum_t ||c_t lda**d_t W_t y||.
+
+        With u = [a_0 y, a_1 y, ...], a_t = c_t lda**d_t, the norms are obtained
+        from the factor R, ||sum_t a_t W_t y|| = ||R u||.
+        """
+        r = Y.shape[0]
+        a = c[:, None] * lda[None, :]**self._tdeg[:, None]
+        # U[t*r + i, j] = a_t(lda_j) Y[i, j]
+        U = (a[:, None, :] * Y[None, :, :]).reshape(-1, len(lda))
+        res = np.linalg.norm(self._R @ U, axis=0)
+        scale = sum(np.linalg.norm(self._R[:, t*r:(t+1)*r] @ U[t*r:(t+1)*r], axis=0)
+                    for t in range(len(c)))
+        return res / scale
+
+    def sweep(self, nus, targets):
+        """ Follow some eigenvalues along a path of nu values.
+
+        At each nu, the closest eigenvalue of the previous one is kept.
+
+        Parameters
+        ----------
+        nus : iterable
+            the successive nu values
+        targets : iterable
+            the eigenvalues at the first point, e.g. the `lda` of the modes at nu0
+
+        Returns
+        -------
+        lda, err : array
+            the eigenvalues and the error indicators, with shape (len(nus), len(targets))
+        """
+        targets = np.array(targets, dtype=complex)
+        lda = np.empty((len(nus), len(targets)), dtype=complex)
+        err = np.empty((len(nus), len(targets)))
+        for i, nu in enumerate(nus):
+            lda[i], err[i] = self.solve(nu, target=targets)
+            targets = lda[i]
+        return lda, err
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define a truncated Taylor series arithmetic
+
+A `TaylorSeries` stores the N+1 first Taylor coefficients
+$$ s(t) = \\sum_{k=0}^N c_k t^k,  \\quad c_k = s^{(k)}(0)/k!, $$
+of a function. The usual operations are done on the coefficients and are
+truncated at order N:
+
+  - Cauchy product in O(N^2), or O(N log N) with FFT for long series,
+  - reciprocal, power (and sqrt), exp and log with the O(N^2) recurrences
+  obtained from the ODE satisfied by these functions,
+  - composition `g(s)` with any function g given by its derivatives at \\(c_0\\).
+
+The derivatives of a composite function are obtained without Faa di Bruno
+formula, e.g. the derivatives of exp(-tau lda(nu)) from the derivatives of lda.
+It is used by `lda_func.Analytic`.
+
+Examples
+--------
+Derivatives of exp(-2 lda(nu)) at nu=0, with lda(nu) = nu + nu**2/2
+>>> import numpy as np
+>>> lda = TaylorSeries([0., 1., 0.5, 0., 0.])
+>>> f = (-2*lda).exp()
+>>> ref = [1., -2., 2., 4., -20.]  # sympy: diff(exp(-2*(x+x**2/2)), x, n)
+>>> np.allclose(f.derivatives(), ref)
+True
+
+Check that sqrt(s)**2 = s and 1/s * s = 1
+>>> s = TaylorSeries([2., 1., 3., -1.])
+>>> np.allclose((s.sqrt()**2).c, s.c), np.allclose((s.reciprocal()*s).c, [1, 0, 0, 0])
+(True, True)
+"""
+
+import numpy as np
+from scipy.special import factorial
+from scipy.signal import fftconvolve
+
+
+class TaylorSeries:
+    """ Truncated Taylor series, defined by its N+1 first coefficients.
+
+    Attributes
+    ----------
+    c : array
+        the Taylor coefficients, `c[k]` is the k-th derivative divided by k!
+    """
+
+    FFT_THRESHOLD = 128
+    """ Use FFT for the product when the series have more coefficients. """
+
+    def __init__(self, c):
+        """ Init the series with its Taylor coefficients.
+        """
+        self.c = np.array(c, dtype=complex, ndmin=1)
+
+    @classmethod
+    def fromDerivatives(cls, d):
+        """ Create the series from the successive derivatives.
+
+        Parameters
+        ----------
+        d : iterable
+            the derivatives of order 0 to N
+        """
+        d = np.asarray(d, dtype=complex)
+        return cls(d / factorial(np.arange(len(d))))
+
+    def derivatives(self):
+        """ Get the derivatives of order 0 to N.
+        """
+        return self.c * factorial(np.arange(len(self.c)))
+
+    @property
+    def N(self):
+        """ The truncation order. """
+        return len(self.c) - 1
+
+    def __len__(self):
+        return len(self.c)
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return "{}({})".format(self.__class__.__name__, self.c)
+
+    def __call__(self, t):
+        """ Evaluate the truncated series at t with Horner scheme.
+        """
+        return np.polynomial.polynomial.polyval(t, self.c)
+
+    # arithmetic
+    def _other(self, other):
+        """ Convert other as a coefficient array with the same length.
+        """
+        if isinstance(other, TaylorSeries):
+            if len(other) != len(self):
+                raise ValueError('The series should have the same truncation order.')
+            return other.c
+        c = np.zeros_like(self.c)
+        c[0] = other
+        return c
+
+    def __add__(self, other):
+        return TaylorSeries(self.c + self._other(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return TaylorSeries(self.c - self._other(other))
+
+    def __rsub__(self, other):
+        return TaylorSeries(self._other(other) - self.c)
+
+    def __neg__(self):
+        return TaylorSeries(-self.c)
+
+    def __mul__(self, other):
+        if isinstance(other, TaylorSeries):
+            return TaylorSeries(_cauchy(self.c, self._other(other)))
+        return TaylorSeries(self.c * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, TaylorSeries):
+            return self * other.reciprocal()
+        return TaylorSeries(self.c / other)
+
+    def __rtruediv__(self, other):
+        return self.reciprocal() * other
+
+    def __pow__(self, p):
+        """ Power of the series, p can be any real or complex number.
+
+        For non integer p, the principal branch is used for c[0].
+        """
+        if isinstance(p, (int, np.integer)) and p >= 0:
+            # exact for polynomials, even if c[0] = 0
+            out = TaylorSeries(self._other(1.))
+            base = self
+            while p:
+                if p & 1:
+                    out = out * base
+                p >>= 1
+                if p:
+                    base = base * base
+            return out
+        return self._power(p)
+
+    # elementary functions, O(N^2) recurrences
+    def reciprocal(self):
+        """ Get the series of 1/s, c[0] must not vanish.
+
+        Obtained from s r = 1.
+        """
+        c = self.c
+        r = np.zeros_like(c)
+        r[0] = 1. / c[0]
+        for k in range(1, len(c)):
+            r[k] = -(c[1:k+1] @ r[k-1::-1]) * r[0]
+        return TaylorSeries(r)
+
+    def _power(self, p):
+        """ Get the series of s**p, c[0] must not vanish.
+
+        Obtained from s P' = p s' P (J.C.P. Miller recurrence).
+        """
+        c = self.c
+        P = np.zeros_like(c)
+        P[0] = c[0]**p
+        for k in range(1, len(c)):
+            j = np.arange(1, k+1)
+            P[k] = (((p + 1)*j - k) * c[1:k+1]) @ P[k-1::-1] / (k*c[0])
+        return TaylorSeries(P)
+
+    def sqrt(self):
+        """ Get the series of sqrt(s), with the principal branch for c[0].
+        """
+        return self._power(0.5)
+
+    def exp(self):
+        """ Get the series of exp(s).
+
+        Obtained from E' = s' E.
+        """
+        c = self.c
+        E = np.zeros_like(c)
+        E[0] = np.exp(c[0])
+        jc = np.arange(len(c)) * c
+        for k in range(1, len(c)):
+            E[k] = jc[1:k+1] @ E[k-1::-1] / k
+        return TaylorSeries(E)
+
+    def log(self):
+        """ Get the series of log(s), with the principal branch for c[0].
+
+        Obtained from s L' = s'.
+        """
+        c = self.c
+        L = np.zeros_like(c)
+        L[0] = np.log(c[0])
+        jL = np.zeros_like(c)
+        for k in range(1, len(c)):
+            L[k] = (c[k] - jL[1:k] @ c[k-1:0:-1] / k) / c[0]
+            jL[k] = k*L[k]
+        return TaylorSeries(L)
+
+    def compose(self, dg):
+        """ Get the series of g(s) from the derivatives of g at c[0].
+
+        The series g(c0 + h) is evaluated with Horner scheme in h = s - c[0],
+        which has no constant term. It requires N products.
+
+        Parameters
+        ----------
+        dg : iterable
+            the derivatives of g of order 0 to N at c[0]
+
+        Returns
+        -------
+        gs : TaylorSeries
+            the series of g(s)
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> s = TaylorSeries([0.3, 1., 0.2, 0.])
+        >>> gs = s.compose(np.cos(0.3 + np.arange(4)*np.pi/2))
+        >>> np.allclose(gs.c, (1j*s).exp().c.real)
+        True
+        """
+        N = self.N
+        g = np.asarray(dg, dtype=complex)[:N+1] / factorial(np.arange(N+1))
+        h = self - self.c[0]
+        out = TaylorSeries(self._other(g[N]))
+        for k in range(N-1, -1, -1):
+            out = out*h + g[k]
+        return out
+
+
+def _cauchy(a, b):
+    """ Truncated Cauchy product of two coefficient arrays with the same length.
+    """
+    n = len(a)
+    if n > TaylorSeries.FFT_THRESHOLD:
+        return fftconvolve(a, b)[:n]
+    return np.convolve(a, b)[:n]
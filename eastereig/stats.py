@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define the profiling statistics of the derivative computation
+
+Each `Eig`, `OP` and `EP` instance has a `stats` attribute. It records the
+duration of each phase (e.g. 'getRHS', 'factorize', 'solve') for each derivative
+order and counters (e.g. 'matvec', 'dK_eval', 'dK_hit'). Nothing is printed
+during the computation. The statistics can be exported in JSON or in the
+Chrome trace format (open with chrome://tracing or https://ui.perfetto.dev).
+
+With `gopts['silent']=True`, the messages of the derivative computation are
+not printed.
+
+Examples
+--------
+>>> stats = Stats('demo')
+>>> for n in range(1, 3):
+...     with stats.timer('getRHS', n):
+...         stats.count('matvec', 2, order=n)
+>>> stats.counters['matvec'], sorted(stats.byOrder())
+(4, [1, 2])
+>>> stats.summary()['getRHS']['count']
+2
+>>> trace = stats.toChromeTrace()
+>>> trace['traceEvents'][0]['name'], trace['traceEvents'][0]['args']
+('getRHS', {'order': 1})
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+
+# common time origin of all the records, to align the traces
+_T0 = time.perf_counter()
+
+
+class Stats:
+    """ Record the duration of the computation phases and some counters.
+
+    The records are thread-safe.
+
+    Attributes
+    ----------
+    name: string
+        the name of the profiled object
+    events: list
+        the list of the timed events `(phase, order, start, duration, thread)`,
+        `start` is relative to the import of the module
+    counters: dict
+        the total value of each counter
+    order_counters: dict
+        the value of each counter per derivative order
+    """
+
+    def __init__(self, name=''):
+        """ Init an empty record.
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        text = "Instance of {} '{}' with #{} events".format(self.__class__.__name__,
+                                                            self.name, len(self.events))
+        for phase, s in self.summary().items():
+            text += "\n  > {:<12s}: {:8.4f} s ({} calls)".format(phase, s['total'], s['count'])
+        for name, value in sorted(self.counters.items()):
+            text += "\n  > {:<12s}: {}".format(name, value)
+        return text
+
+    def reset(self):
+        """ Remove all the records.
+        """
+        with self._lock:
+            self.events = []
+            self.counters = defaultdict(int)
+            self.order_counters = defaultdict(lambda: defaultdict(int))
+
+    @contextmanager
+    def timer(self, phase, order=None):
+        """ Context manager that records the duration of a phase.
+
+        Parameters
+        ----------
+        phase : string
+            the name of the phase
+        order : int, optional
+            the derivative order
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stop = time.perf_counter()
+            with self._lock:
+                self.events.append((phase, order, start - _T0, stop - start,
+                                    threading.get_ident()))
+
+    def count(self, name, n=1, order=None):
+        """ Increment a counter.
+
+        Parameters
+        ----------
+        name : string
+            the name of the counter
+        n : int
+            the increment
+        order : int, optional
+            the derivative order
+        """
+        with self._lock:
+            self.counters[name] += n
+            if order is not None:
+                self.order_counters[order][name] += n
+
+    def summary(self):
+        """ Get the number of calls and the total duration of each phase.
+
+        Returns
+        -------
+        summary : dict
+            `summary[phase]` is a dict with the keys 'count' and 'total'
+        """
+        summary = {}
+        for phase, _, _, duration, _ in self.events:
+            s = summary.setdefault(phase, {'count': 0, 'total': 0.})
+            s['count'] += 1
+            s['total'] += duration
+        return summary
+
+    def byOrder(self):
+        """ Get the duration of each phase and the counters for each derivative order.
+
+        Returns
+        -------
+        orders : dict
+            `orders[n][phase]` is the total duration of the phase at order n and
+            `orders[n][counter]` the value of the counter at order n
+        """
+        orders = defaultdict(dict)
+        for phase, order, _, duration, _ in self.events:
+            if order is not None:
+                orders[order][phase] = orders[order].get(phase, 0.) + duration
+        for order, counters in self.order_counters.items():
+            orders[order].update(counters)
+        return dict(orders)
+
+    def toJSON(self, filename=None):
+        """ Export the statistics as a JSON compatible dict.
+
+        Parameters
+        ----------
+        filename : string, optional
+            if given, the dict is written in this file
+
+        Returns
+        -------
+        data : dict
+            the statistics
+        """
+        data = {'name': self.name,
+                'summary': self.summary(),
+                'counters': dict(self.counters),
+                'orders': {str(k): v for k, v in sorted(self.byOrder().items())},
+                'events': [{'phase': phase, 'order': order, 'start': start,
+                            'duration': duration}
+                           for phase, order, start, duration, _ in self.events]}
+        if filename is not None:
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=1)
+        return data
+
+    def toChromeTrace(self, filename=None):
+        """ Export the timed events in the Chrome trace format.
+
+        Parameters
+        ----------
+        filename : string, optional
+            if given, the trace is written in this file
+
+        Returns
+        -------
+        trace : dict
+            the trace, times are in microseconds
+        """
+        pid = os.getpid()
+        events = []
+        for phase, order, start, duration, tid in self.events:
+            event = {'name': phase, 'cat': self.name, 'ph': 'X', 'pid': pid,
+                     'tid': tid, 'ts': start*1e6, 'dur': duration*1e6}
+            if order is not None:
+                event['args'] = {'order': order}
+            events.append(event)
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms',
+                 'otherData': {'counters': dict(self.counters)}}
+        if filename is not None:
+            with open(filename, 'w') as f:
+                json.dump(trace, f)
+        return trace
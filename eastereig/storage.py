@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of eastereig, a library to locate exceptional points
+# and to reconstruct eigenvalues loci.
+
+# Eastereig is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# Eastereig is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with Eastereig.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+##Define the storage of the eigenvalue and eigenvector derivatives
+
+By default, `Eig` objects store the derivatives `dlda` and `dx` in python lists.
+With `storage='array'`, they are stored in a contiguous preallocated block,
+one row per derivative order. This avoids the fragmentation of many separately
+allocated vectors and allows to combine several derivatives with a single
+matrix-vector product.
+
+With `storage='memmap'`, the block of `dx` is a memory-mapped `.npy` file
+(`MemmapStore`), only `dlda` stays in memory. The rows are written as soon as
+they are computed and are read back only when needed. The file is reused by
+`export` and `load`.
+
+Only full vectors are supported (numpy and scipysp libs).
+
+Examples
+--------
+>>> import numpy as np
+>>> dx = ArrayStore(capacity=3)
+>>> for k in range(4):
+...     dx.append(np.full(2, k, dtype=complex))
+>>> len(dx), dx.capacity
+(4, 6)
+>>> dx[-1]
+array([3.+0.j, 3.+0.j])
+>>> dx.combine([1, 3], [2., 1.])
+array([5.+0.j, 5.+0.j])
+>>> np.array(dx).shape
+(4, 2)
+
+The storage is chosen when the eigenpairs are extracted
+>>> from eastereig.examples.ThreeDoF import ThreeDof
+>>> model = ThreeDof([1., 2., 3, 1., 1., 1.], 1., 5)
+>>> model.createSolver(pb_type='gen')
+>>> _ = model.solver.solve()
+> Solve gen eigenvalue problem with NumpyEigSolver class...
+<BLANKLINE>
+>>> ev_list, = model.solver.extract([1])
+>>> ev_array, = model.solver.extract([1], storage='array')
+>>> ev_list.getDerivatives(8, model)
+> Linear solve...
+>>> ev_array.getDerivatives(8, model)
+> Linear solve...
+>>> ev_array.dx
+Instance of ArrayStore with #9 items of shape (3,)
+>>> np.allclose(ev_array.dlda, ev_list.dlda, rtol=1e-12)
+True
+
+The derivatives can be extended later, only the missing orders are computed
+with the kept factorization
+>>> ev_inc, = model.solver.extract([1], storage='array')
+>>> ev_inc.getDerivatives(4, model, keep_factor=True)
+> Linear solve...
+>>> ev_inc.getDerivatives(8, model)
+> Linear solve...
+>>> len(ev_inc.dlda), np.allclose(ev_inc.dx, ev_list.dx, rtol=1e-12)
+(9, True)
+>>> ev_inc._factor is None
+True
+
+With the memmap storage, `export` only saves the path of the dx file, which is
+opened again by `load`
+>>> import os, tempfile
+>>> import eastereig as ee
+>>> tmpdir = tempfile.mkdtemp()
+>>> ev_mmap, = model.solver.extract([1], storage='memmap',
+...                                 dxfile=os.path.join(tmpdir, 'ev_dx.npy'))
+>>> ev_mmap.getDerivatives(8, model)
+> Linear solve...
+>>> ev_mmap.export(os.path.join(tmpdir, 'ev'))
+>>> ev_load = ee.Eig('numpy')
+>>> ev_load.load(os.path.join(tmpdir, 'ev.npz'))
+>>> type(ev_load.dx[3])
+<class 'numpy.memmap'>
+>>> np.allclose(ev_load.dx[8], ev_list.dx[8], rtol=1e-12)
+True
+>>> import shutil
+>>> shutil.rmtree(tmpdir)
+"""
+
+import os
+import tempfile
+import weakref
+import numpy as np
+
+
+class ArrayStore:
+    """ List-like container of derivatives stored in a contiguous array.
+
+    The k-th derivative is the k-th row of the block. The block is allocated
+    at the first append and grows if needed, call `reserve` to preallocate it.
+
+    Attributes
+    ----------
+    capacity: int
+        the number of rows allocated
+    dtype: numpy dtype
+        the type of the stored value
+    """
+
+    def __init__(self, capacity=1, dtype=complex):
+        """ Init an empty store.
+        """
+        self.capacity = max(int(capacity), 1)
+        self.dtype = np.dtype(dtype)
+        self._data = None
+        self._n = 0
+
+    def __repr__(self):
+        """ Define the representation of the class
+        """
+        return "Instance of {} with #{} items of shape {}".format(self.__class__.__name__,
+                                                                   self._n, self.shape[1:])
+
+    @property
+    def shape(self):
+        """ The shape of the stored values, as if they were an array.
+        """
+        if self._data is None:
+            return (0,)
+        return (self._n,) + self._data.shape[1:]
+
+    @property
+    def array(self):
+        """ A view on the stored values (no copy).
+        """
+        if self._data is None:
+            return np.zeros((0,), dtype=self.dtype)
+        return self._data[:self._n]
+
+    def _allocate(self, capacity, item_shape):
+        """ Allocate the block, used also to grow it.
+        """
+        data = np.zeros((capacity,) + tuple(item_shape), dtype=self.dtype)
+        if self._data is not None:
+            data[:self._n] = self._data[:self._n]
+        self._data = data
+        self.capacity = capacity
+
+    def reserve(self, capacity, item_shape=None):
+        """ Allocate at least `capacity` rows.
+
+        Parameters
+        ----------
+        capacity : int
+            the number of rows
+        item_shape : tuple, optional
+            the shape of one value, needed only if the store is empty
+        """
+        if self._data is None:
+            if item_shape is None:
+                # allocation is done at the first append
+                self.capacity = max(self.capacity, capacity)
+                return
+            self._allocate(max(self.capacity, capacity), item_shape)
+        elif capacity > self.capacity:
+            self._allocate(capacity, self._data.shape[1:])
+
+    def __len__(self):
+        return self._n
+
+    def _index(self, key):
+        """ Check and normalize an integer index.
+        """
+        if key < 0:
+            key += self._n
+        if key < 0 or key >= self._n:
+            raise IndexError('ArrayStore index out of range')
+        return key
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.array[key]
+        return self._data[self._index(key)]
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            self.array[key] = value
+        else:
+            self._data[self._index(key)] = value
+
+    def __iter__(self):
+        for k in range(self._n):
+            yield self._data[k]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.array.copy()
+        return self.array.astype(dtype)
+
+    def append(self, value):
+        """ Copy `value` in the next row.
+        """
+        value = np.asarray(value)
+        if self._data is None:
+            self._allocate(self.capacity, value.shape)
+        elif self._n == self.capacity:
+            self._allocate(2*self.capacity, self._data.shape[1:])
+        self._data[self._n] = value
+        self._n += 1
+
+    def extend(self, values):
+        """ Append all the `values`.
+        """
+        for value in values:
+            self.append(value)
+
+    def truncate(self, n):
+        """ Keep only the first `n` values, the memory is kept.
+        """
+        self._n = min(self._n, n)
+
+    def combine(self, index, coef):
+        """ Compute the linear combination sum_i coef[i]*self[index[i]].
+
+        Contiguous rows are combined with a single matrix-vector product
+        without copy.
+
+        Parameters
+        ----------
+        index : list
+            the derivative orders
+        coef : list
+            the coefficients of the combination
+
+        Returns
+        -------
+        y : array
+            the linear combination
+        """
+        if len(index) == 1:
+            return self[index[0]] * coef[0]
+        start, stop = min(index), max(index) + 1
+        # dense coefficients on the row range, the gaps are 0
+        c = np.zeros(stop - start, dtype=np.result_type(self.dtype, np.asarray(coef)))
+        for i, ci in zip(index, coef):
+            c[i - start] += ci
+        return c @ self.array[start:stop]
+
+
+def _remove(filename):
+    """ Remove a temporary file, if it still exists.
+    """
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+class MemmapStore(ArrayStore):
+    """ List-like container of derivatives stored in a memory-mapped `.npy` file.
+
+    The file contains `capacity` rows, only the first `len(store)` are
+    meaningful. If no filename is given, a temporary file is created and removed
+    when the store is deleted, unless `keep` is called.
+
+    Attributes
+    ----------
+    filename: string
+        the path of the `.npy` file
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> dx = MemmapStore(capacity=2)
+    >>> for k in range(3):
+    ...     dx.append(np.full(4, k, dtype=complex))
+    >>> dx.capacity, dx.filename.endswith('.npy')
+    (4, True)
+    >>> dx.flush()
+    >>> dx2 = MemmapStore.open(dx.filename, 3)
+    >>> dx2.combine([0, 1, 2], [1., 1., 1.])
+    array([3.+0.j, 3.+0.j, 3.+0.j, 3.+0.j])
+    """
+
+    def __init__(self, capacity=1, dtype=complex, filename=None):
+        """ Init an empty store, the file is created at the first append.
+        """
+        super().__init__(capacity, dtype)
+        self._finalizer = None
+        if filename is None:
+            fd, filename = tempfile.mkstemp(suffix='.npy', prefix='eastereig_dx_')
+            os.close(fd)
+            self._finalizer = weakref.finalize(self, _remove, filename)
+        self.filename = os.path.abspath(filename)
+
+    @classmethod
+    def open(cls, filename, n, mode='r+'):
+        """ Open an existing store file without copy.
+
+        Parameters
+        ----------
+        filename : string
+            the path of the `.npy` file
+        n : int
+            the number of meaningful rows
+        mode : string
+            the numpy memmap mode ('r+' or 'r')
+        """
+        store = cls(filename=filename)
+        store._data = np.load(store.filename, mmap_mode=mode)
+        store.capacity = store._data.shape[0]
+        store.dtype = store._data.dtype
+        store._n = n
+        return store
+
+    def _allocate(self, capacity, item_shape):
+        """ Allocate the file, used also to grow it.
+        """
+        shape = (capacity,) + tuple(item_shape)
+        if self._data is None:
+            self._data = np.lib.format.open_memmap(self.filename, mode='w+',
+                                                   dtype=self.dtype, shape=shape)
+        else:
+            # copy in a new file, then replace the old one
+            tmp = self.filename + '.tmp'
+            data = np.lib.format.open_memmap(tmp, mode='w+', dtype=self.dtype, shape=shape)
+            data[:self._n] = self._data[:self._n]
+            data.flush()
+            del data
+            self._data = None
+            os.replace(tmp, self.filename)
+            self._data = np.load(self.filename, mmap_mode='r+')
+        self.capacity = capacity
+
+    def flush(self):
+        """ Write the changes on the disk.
+        """
+        if self._data is not None and hasattr(self._data, 'flush'):
+            self._data.flush()
+
+    def keep(self):
+        """ Prevent the removal of a temporary file.
+        """
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
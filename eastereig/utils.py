@@ -21,6 +21,7 @@ Contains helping functions (combinatoric, ...)
 import numpy as np
 from numpy import zeros, asarray, eye, poly1d, hstack, r_
 from scipy import linalg
+from scipy.special import factorial
 
 def multinomial_index_coefficients(m, n):
     r"""Return a tuple containing pairs ``((k1,k2,..,km) , C_kn)``
@@ -172,3 +173,98 @@ def pade(an, m, n=None):
     p = pq[:n+1]
     q = r_[1.0, pq[n+1:]]
     return poly1d(p[::-1]), poly1d(q[::-1])
+
+
+def taylorShift(c, z0):
+    r"""Compute the coefficients of the translated polynomial p(t - z0), from the
+    coefficients c of p(t) in ascending order.
+
+    It is equivalent to `EP.Pmatrix(z0, len(c)) @ c` with
+    $$ r_i = \sum_{j \ge i} \binom{j}{i} (-z_0)^{j-i} c_j, $$
+    computed as a correlation between \( j!\, c_j \) and \( (-z_0)^m / m! \) with
+    one convolution instead of the N x N matrix.
+
+    Parameters
+    ----------
+    c : (N,) array_like
+        the polynomial coefficients in ascending order
+    z0 : complex
+        the translation
+
+    Returns
+    -------
+    r : (N,) array
+        the coefficients of p(t - z0)
+
+    Examples
+    --------
+    >>> taylorShift([1., 2., 3.], 1.)  # 1 + 2(t-1) + 3(t-1)**2
+    array([ 2.+0.j, -4.+0.j,  3.+0.j])
+    """
+    c = np.asarray(c, dtype=complex)
+    N = len(c)
+    if N > 170:
+        # the factorials overflow, use repeated synthetic divisions
+        r = c.copy()
+        for i in range(N - 1):
+            for j in range(N - 2, i - 1, -1):
+                r[j] -= z0*r[j+1]
+        return r
+    fact = factorial(np.arange(N))
+    u = c*fact
+    v = (-z0)**np.arange(N) / fact
+    # r_i i! = sum_m u_{i+m} v_m
+    return np.convolve(u[::-1], v)[:N][::-1] / fact
+
+
+def aberth(c, z, tol=1e-14, maxit=50):
+    r"""Refine simultaneously all the roots of a polynomial with the
+    Aberth-Ehrlich iterations, starting from the approximations z.
+
+    Each iteration reads
+    $$ z_k \leftarrow z_k - \frac{p(z_k)/p'(z_k)}{1 - p(z_k)/p'(z_k) \sum_{j \neq k} 1/(z_k - z_j)}, $$
+    with a cubic convergence for simple roots. It is well suited to refine
+    roots that are already close, e.g. the roots of a polynomial of lower degree.
+
+    Parameters
+    ----------
+    c : (d+1,) array_like
+        the polynomial coefficients in ascending order
+    z : (d,) array_like
+        the initial approximations of the d roots, they must be distinct
+    tol : float
+        the relative tolerance on the correction
+    maxit : int
+        the maximal number of iterations
+
+    Returns
+    -------
+    z : (d,) array
+        the roots
+    converged : bool
+        True if all the corrections are below tol
+
+    Examples
+    --------
+    >>> z, converged = aberth([-6., 11., -6., 1.], [0.8, 2.3+0.1j, 2.9])
+    >>> converged, np.allclose(z, [1., 2., 3.])
+    (True, True)
+    """
+    c = np.asarray(c, dtype=complex)
+    z = np.array(z, dtype=complex)
+    dc = np.polynomial.polynomial.polyder(c)
+    d = len(z)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for it in range(maxit):
+            ratio = np.polynomial.polynomial.polyval(z, c) / np.polynomial.polynomial.polyval(z, dc)
+            diff = z[:, None] - z[None, :]
+            diff[np.arange(d), np.arange(d)] = np.inf
+            w = ratio / (1. - ratio*(1./diff).sum(axis=1))
+            # exact roots
+            w[ratio == 0] = 0.
+            if not np.isfinite(w).all():
+                return z, False
+            z -= w
+            if (np.abs(w) <= tol*np.maximum(np.abs(z), 1.)).all():
+                return z, True
+    return z, False